@@ -0,0 +1,46 @@
+import os, re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from backend.models.market_data import provider as market_provider
+
+# symbols analysed at once; each one fans out ~4 source jobs onto the
+# per-provider executors, so keep it near the smallest BUDGET_* in
+# backend/models/fanout.py or the extra jobs only queue there
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 3))
+MAX_BATCH         = int(os.getenv("MAX_BATCH", 500))
+
+_SYMBOL = re.compile(r'^[A-Z0-9.\-^=]{1,12}$')
+
+
+def normalize_symbols(symbols) -> list:
+    """Upper-case, validate, de-duplicate (order kept) and cap a watchlist."""
+    out = []
+    for s in symbols or []:
+        s = str(s).strip().upper()
+        if _SYMBOL.match(s) and s not in out:
+            out.append(s)
+    return out[:MAX_BATCH]
+
+
+def analyze_many(symbols: list, analyze, *args):
+    """
+    Run analyze(symbol, *args) for every symbol and yield
+    (symbol, result, error) as each one completes.  OHLC for the whole list
+    is pulled up front with one bulk Yahoo download.
+    """
+    try:
+        market_provider.prefetch_history(symbols)
+    except Exception:
+        pass                                    # per-symbol fetches still work
+
+    pool    = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="batch")
+    futures = {pool.submit(analyze, sym, *args): sym for sym in symbols}
+    try:
+        for fut in as_completed(futures):
+            try:
+                yield futures[fut], fut.result(), None
+            except Exception as exc:
+                yield futures[fut], None, exc
+    finally:
+        # consumer may stop early: drop whatever hasn't started yet
+        pool.shutdown(wait=False, cancel_futures=True)
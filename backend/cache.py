@@ -1,16 +1,305 @@
-import os, json, functools, redis
+import os, json, copy, time, inspect, datetime, functools, threading, redis
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backend.metrics import CACHE
 
 r = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 
-def cached(ttl: int = 90 * 60):      # default 90 min
+# ── per-source freshness (seconds); override with CACHE_TTL_<SOURCE> ──────
+TTLS = {
+    'quote'       :  1 * 60,
+    'reddit'      : 10 * 60,
+    'twitter'     :  3 * 60,
+    'news'        : 15 * 60,
+    'history'     : 30 * 60,
+    'fundamentals':  6 * 60 * 60,
+}
+TTLS = {k: int(os.getenv(f"CACHE_TTL_{k.upper()}", v)) for k, v in TTLS.items()}
+
+# how long past its TTL an entry may still be served while it refreshes
+STALE_FACTOR = float(os.getenv("CACHE_STALE_FACTOR", 1.0))
+# how much longer it is kept as a last resort while the provider is out
+GRACE_FACTOR = float(os.getenv("CACHE_GRACE_FACTOR", 4.0))
+
+
+class ProviderUnavailable(Exception):
+    """Raised by a fetcher when it must not hit the network (quota, breaker)."""
+
+
+# --------------------------------------------------------------------
+# typed codec: JSON with tags so DataFrame / Series / timestamps survive
+# --------------------------------------------------------------------
+def _enc_index(idx: pd.Index) -> dict:
+    if isinstance(idx, pd.DatetimeIndex):
+        i8 = idx.values.astype('datetime64[ns]').astype('int64')   # UTC wall clock
+        return {'__pd__': 'dtindex', 'i8': i8.tolist(), 'name': idx.name,
+                'tz': str(idx.tz) if idx.tz else None, 'freq': idx.freqstr,
+                'unit': getattr(idx, 'unit', 'ns')}
+    return {'__pd__': 'index', 'values': idx.tolist(), 'name': idx.name,
+            'dtype': str(idx.dtype)}
+
+
+def _dec_index(d: dict) -> pd.Index:
+    if d['__pd__'] == 'dtindex':
+        idx = pd.to_datetime(d['i8'], unit='ns', utc=bool(d['tz']))
+        if d['tz']:
+            idx = idx.tz_convert(d['tz'])
+        idx = pd.DatetimeIndex(idx, name=d['name'])
+        if hasattr(idx, 'as_unit'):
+            idx = idx.as_unit(d.get('unit', 'ns'))
+        if d['freq']:
+            try:
+                idx.freq = d['freq']
+            except ValueError:
+                pass
+        return idx
+    return pd.Index(d['values'], name=d['name'], dtype=_dtype(d['dtype']))
+
+
+def _dtype(name: str):
+    try:
+        return pd.api.types.pandas_dtype(name)
+    except TypeError:
+        return None
+
+
+def _column(values, dtype: str, index=None, name=None) -> pd.Series:
+    try:
+        return pd.Series(values, index=index, name=name, dtype=_dtype(dtype))
+    except (TypeError, ValueError):
+        return pd.Series(values, index=index, name=name)
+
+
+def _default(o):
+    if isinstance(o, pd.DataFrame):
+        return {'__pd__': 'frame', 'index': _enc_index(o.index),
+                'columns': list(o.columns),
+                'dtypes': [str(t) for t in o.dtypes],
+                'data': [o[c].tolist() for c in o.columns]}
+    if isinstance(o, pd.Series):
+        return {'__pd__': 'series', 'index': _enc_index(o.index), 'name': o.name,
+                'dtype': str(o.dtype), 'values': o.tolist()}
+    if isinstance(o, pd.Index):
+        return _enc_index(o)
+    if isinstance(o, (pd.Timestamp, datetime.datetime)):
+        return {'__pd__': 'ts', 'v': o.isoformat()}
+    if isinstance(o, datetime.date):
+        return {'__pd__': 'date', 'v': o.isoformat()}
+    if o is pd.NaT:
+        return {'__pd__': 'nat'}
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, (set, tuple)):
+        return list(o)
+    raise TypeError(f"cannot encode {type(o).__name__}")
+
+
+def _hook(d: dict):
+    tag = d.get('__pd__')
+    if tag is None:
+        return d
+    # object_hook works inside-out, so nested index dicts are already decoded
+    if tag == 'frame':
+        idx = d['index']
+        return pd.DataFrame({c: _column(v, t, index=idx)
+                             for c, t, v in zip(d['columns'], d['dtypes'], d['data'])},
+                            index=idx, columns=d['columns'])
+    if tag == 'series':
+        return _column(d['values'], d['dtype'], index=d['index'], name=d['name'])
+    if tag in ('dtindex', 'index'):
+        return _dec_index(d)
+    if tag == 'ts':
+        return pd.Timestamp(d['v'])
+    if tag == 'date':
+        return datetime.date.fromisoformat(d['v'])
+    if tag == 'nat':
+        return pd.NaT
+    return d
+
+
+def dumps(obj) -> bytes:
+    return json.dumps(obj, default=_default).encode('utf-8')
+
+
+def loads(raw: bytes):
+    return json.loads(raw, object_hook=_hook)
+
+
+# --------------------------------------------------------------------
+# tier 1: in-process LRU  (values are deep-copied out, callers may mutate)
+# --------------------------------------------------------------------
+class LRU:
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data   = OrderedDict()
+        self._lock   = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            if hit[2] < time.time():            # past its stale window
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return hit
+
+    def set(self, key, stored_at: float, value, expires_at: float):
+        with self._lock:
+            self._data[key] = (stored_at, value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local = LRU(int(os.getenv("CACHE_LRU_SIZE", 512)))
+
+_refresh_pool = ThreadPoolExecutor(max_workers=int(os.getenv("CACHE_REFRESH_WORKERS", 4)),
+                                   thread_name_prefix="cache-refresh")
+_refreshing   = {}                        # key → until (inf while this process refreshes)
+_refresh_lock = threading.Lock()
+
+
+def _read(key):
+    if (hit := local.get(key)) is not None:
+        return hit[0], hit[1]
+    try:
+        raw = r.get(key)
+    except redis.RedisError:
+        return None
+    if raw is None:
+        return None
+    env = loads(raw)
+    try:
+        expires_at = time.time() + max(r.ttl(key), 0)
+    except redis.RedisError:
+        expires_at = time.time()
+    local.set(key, env['at'], env['v'], expires_at)
+    return env['at'], env['v']
+
+
+def _write(key, value, ttl: int, stale: int):
+    now  = time.time()
+    keep = ttl + stale + int(ttl * GRACE_FACTOR)
+    local.set(key, now, value, now + keep)
+    try:
+        r.setex(key, keep, dumps({'at': now, 'v': value}))
+    except (redis.RedisError, TypeError):
+        pass
+
+
+def _refresh(key, fn, args, kwargs, ttl, stale):
+    until = None
+    try:
+        lock = f"refresh:{key}"
+        try:
+            # one refresher per key across processes, too
+            if not r.set(lock, 1, nx=True, ex=max(ttl // 2, 5)):
+                # theirs: keep serving our stale copy until their lock runs out
+                until = time.time() + max(r.pttl(lock), 0) / 1000
+                return
+        except redis.RedisError:
+            pass
+        _write(key, fn(*args, **kwargs), ttl, stale)
+    except Exception:
+        pass                                    # keep serving the stale copy
+    finally:
+        with _refresh_lock:
+            if until is None:
+                _refreshing.pop(key, None)
+            else:
+                _refreshing[key] = until
+
+
+def cached(ttl: int | None = None, source: str | None = None, stale: int | None = None):
+    """
+    Two-tier cache (process LRU → Redis) with stale-while-revalidate.
+    ttl    = seconds an entry is fresh (defaults to TTLS[source], else 90 min)
+    stale  = extra seconds a stale entry is served while a background
+             refresh runs (defaults to ttl * CACHE_STALE_FACTOR)
+    Exceptions are never cached.  Past the stale window the entry is kept
+    for a grace period and returned only if the fetcher raises
+    ProviderUnavailable (quota exhausted, circuit open).
+    """
+    ttl   = ttl or TTLS.get(source, 90 * 60)
+    stale = int(ttl * STALE_FACTOR) if stale is None else stale
+
     def wrap(fn):
+        prefix = f"cache:{source or fn.__module__}:{fn.__qualname__}"
+        label  = source or fn.__qualname__
+        # methods: `self` only names the owner (already in the prefix)
+        skip   = int(next(iter(inspect.signature(fn).parameters), None) == 'self')
+
+        def key_for(args, kwargs):
+            # anything JSON can't encode raises TypeError instead of colliding
+            return f"{prefix}:{json.dumps([args[skip:], kwargs], sort_keys=True)}"
+
         @functools.wraps(fn)
         def inner(*args, **kwargs):
-            key = f"{fn.__name__}:{json.dumps([args, kwargs], sort_keys=True)}"
-            if (val := r.get(key)) is not None:
-                return json.loads(val)
-            val = fn(*args, **kwargs)
-            r.setex(key, ttl, json.dumps(val, default=str))
-            return val
+            key = key_for(args, kwargs)
+
+            hit = _read(key)
+            if hit is not None:
+                age = time.time() - hit[0]
+                if age <= ttl + stale:
+                    CACHE.inc(source=label, result='stale' if age > ttl else 'hit')
+                    if age > ttl:
+                        with _refresh_lock:
+                            until = _refreshing.get(key)
+                            start = until is None
+                            if start:
+                                _refreshing[key] = float('inf')
+                            elif until < time.time():
+                                # another process's refresh is over: read its result next time
+                                del _refreshing[key]
+                                local.pop(key)
+                        if start:
+                            _refresh_pool.submit(_refresh, key, fn, args, kwargs, ttl, stale)
+                    return copy.deepcopy(hit[1])
+
+            try:
+                value = fn(*args, **kwargs)
+            except ProviderUnavailable:
+                if hit is None:
+                    CACHE.inc(source=label, result='unavailable')
+                    raise
+                CACHE.inc(source=label, result='grace')
+                return copy.deepcopy(hit[1])            # grace: old beats nothing
+            CACHE.inc(source=label, result='miss')
+            _write(key, value, ttl, stale)
+            return copy.deepcopy(value)
+
+        def prime(value, *args, **kwargs):
+            """Store a value fetched elsewhere (e.g. in bulk) under these args."""
+            _write(key_for(args, kwargs), value, ttl, stale)
+
+        def fresh(*args, **kwargs) -> bool:
+            """True while the entry under these args is still within its TTL."""
+            key = key_for(args, kwargs)
+            if (hit := local.get(key)) is not None:
+                return time.time() - hit[0] <= ttl
+            try:
+                return r.ttl(key) > stale + int(ttl * GRACE_FACTOR)
+            except redis.RedisError:
+                return False
+
+        inner.cache_prefix = prefix
+        inner.prime        = prime
+        inner.fresh        = fresh
         return inner
     return wrap
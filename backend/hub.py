@@ -0,0 +1,103 @@
+# backend/hub.py
+import asyncio
+import logging
+from collections import defaultdict
+
+log = logging.getLogger(__name__)
+
+# queue marker: "send this socket the latest full frame" (backend/stream_codec.py)
+RESYNC = object()
+
+
+class StreamHub:
+    """
+    One Redis subscriber task per symbol per process.  Each message is read
+    once and offered to every socket registered in `subs[symbol]`; sockets
+    own a small bounded queue.  A socket that falls behind has its backlog
+    of deltas coalesced into a single RESYNC (one fresh full frame) instead
+    of stalling the broadcast.
+    """
+
+    def __init__(self, redis, subs: defaultdict, queue_size: int = 8):
+        self.r          = redis
+        self.subs       = subs
+        self.queue_size = queue_size
+        self.dropped    = 0
+        self._queues    = {}                  # ws → asyncio.Queue
+        self._readers   = {}                  # symbol → asyncio.Task
+        self._lock      = asyncio.Lock()
+
+    # ---------- subscription refcount ----------
+    async def join(self, symbol: str, ws) -> asyncio.Queue:
+        async with self._lock:
+            q = asyncio.Queue(maxsize=self.queue_size)
+            q.put_nowait(RESYNC)                # new subscribers start from a full frame
+            self._queues[ws] = q
+            self.subs[symbol].add(ws)
+            if symbol not in self._readers:
+                self._readers[symbol] = asyncio.create_task(self._reader(symbol))
+            return q
+
+    async def leave(self, symbol: str, ws) -> None:
+        async with self._lock:
+            self._queues.pop(ws, None)
+            self.subs[symbol].discard(ws)
+            if self.subs[symbol]:
+                return
+            self.subs.pop(symbol, None)
+            task = self._readers.pop(symbol, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def close(self) -> None:
+        tasks = list(self._readers.values())
+        self._readers.clear()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ---------- delivery ----------
+    def offer(self, ws, data) -> None:
+        q = self._queues.get(ws)
+        if q is None:
+            return
+        if q.full():                          # coalesce: drop backlog, resend state
+            self.dropped += q.qsize()
+            while not q.empty():
+                q.get_nowait()
+            data = RESYNC
+        q.put_nowait(data)
+
+    def resync(self, ws) -> None:
+        self.offer(ws, RESYNC)
+
+    async def latest(self, symbol: str) -> bytes | None:
+        return await self.r.get(f"stream:last:{symbol}")
+
+    def broadcast(self, symbol: str, data: bytes) -> None:
+        for ws in tuple(self.subs.get(symbol, ())):
+            self.offer(ws, data)
+
+    async def _reader(self, symbol: str) -> None:
+        delay = 1
+        while True:
+            pubsub = self.r.pubsub()
+            try:
+                await pubsub.subscribe(f"stream:{symbol}")
+                delay = 1
+                async for msg in pubsub.listen():
+                    if msg["type"] == "message":
+                        self.broadcast(symbol, msg["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:              # redis hiccup: resubscribe
+                log.warning("stream reader %s failed: %s", symbol, exc)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+            finally:
+                try:
+                    await pubsub.unsubscribe()
+                    await pubsub.aclose()
+                except Exception:
+                    pass
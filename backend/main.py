@@ -1,18 +1,47 @@
 # backend/main.py
-import os, json
+import os, asyncio, functools
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, WebSocket, Request
+from fastapi.responses import JSONResponse, StreamingResponse, Response, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # ─── env + domain code ───────────────────────────────────────────────
 load_dotenv()
 
-from backend.models.unified_sentiment import get_unified_sentiment
-from backend.models.fundamentals      import FundamentalsFetcher
+from backend import startup
+
+with startup.timed("import backend.models"):
+    from backend.models.unified_sentiment import get_unified_sentiment
+    from backend.models.fundamentals      import FundamentalsFetcher
+    from backend.models.market_data       import provider as market_provider
+from backend.singleflight             import single_flight
+from backend.batch                    import normalize_symbols, BATCH_CONCURRENCY
+from backend                          import serialize, metrics
+from backend.timeseries               import ts_store, parse_range, RESOLUTIONS
+from backend.models                   import scoring_pool
 
 fund_fetcher = FundamentalsFetcher()
 
+# identical (symbol, window, twitter) analyses share one upstream round
+shared_unified_sentiment = single_flight("unified")(get_unified_sentiment)
+
+# bounded pool for blocking domain code (PRAW, tweepy, yfinance, pandas);
+# the event loop only awaits it, so one slow upstream can't stall the worker
+BLOCKING_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("API_BLOCKING_WORKERS", 8)),
+    thread_name_prefix="api-blocking",
+)
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # carry the request's span list (backend/metrics.py) into the pool thread
+    return await loop.run_in_executor(BLOCKING_POOL,
+                                      metrics.propagate(functools.partial(fn, *args, **kwargs)))
+
+# Server-Timing header on /analyze (fetch_*, score, resample, aggregate, serialize)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
 # ─── FastAPI instance + CORS ─────────────────────────────────────────
 app = FastAPI()
 app.add_middleware(
@@ -34,71 +63,197 @@ async def analyze(request: Request):
       "window": 5,
       "twitter": true
     }
+    Response shape follows the Accept header (or ?format=columnar|arrow):
+    see backend/serialize.py.  Without either, the legacy JSON is returned.
     """
     body = await request.json()
     sym             = body.get("stock_symbol", "").upper()
     window          = int(body.get("window", 5))
     include_twitter = bool(body.get("twitter", True))
 
+    media_type = serialize.negotiate(request.headers.get("accept", ""),
+                                     request.query_params.get("format"))
+    with metrics.collect() as spans:
+        try:
+            with metrics.span("analyze"):
+                content, headers = await run_blocking(
+                    encode_analysis, sym, window, include_twitter,
+                    media_type, request.headers.get("accept-encoding", ""))
+        except Exception as exc:
+            metrics.REQUESTS.inc(route="/analyze", status="500")
+            return JSONResponse({"error": str(exc)}, status_code=500)
+    metrics.REQUESTS.inc(route="/analyze", status="200")
+    if SERVER_TIMING:
+        headers["Server-Timing"] = metrics.server_timing(spans)
+    return Response(content, media_type=media_type, headers=headers)
+
+
+def run_analysis(sym: str, window: int, include_twitter: bool) -> dict:
+    """Blocking part of /analyze: fetch and aggregate (corr comes from the rolling engine)."""
+    return shared_unified_sentiment(sym, window, include_twitter)
+
+
+def encode_analysis(sym: str, window: int, include_twitter: bool,
+                    media_type: str, accept_encoding: str = "") -> tuple[bytes, dict]:
+    return serialize.encode(run_analysis(sym, window, include_twitter),
+                            media_type, accept_encoding)
+
+
+def build_analysis(sym: str, window: int, include_twitter: bool) -> dict:
+    """Legacy payload as a plain dict (one line of /analyze/batch)."""
+    return serialize.legacy(run_analysis(sym, window, include_twitter))
+
+@app.post("/analyze/batch")
+async def analyze_batch(request: Request):
+    """
+    Body JSON:
+    {
+      "symbols": ["AAPL", "MSFT", ...],
+      "window": 5,
+      "twitter": false
+    }
+    Streams one NDJSON line per symbol, in completion order.
+    """
+    body            = await request.json()
+    symbols         = normalize_symbols(body.get("symbols"))
+    window          = int(body.get("window", 5))
+    include_twitter = bool(body.get("twitter", False))
+    if not symbols:
+        return JSONResponse({"error": "no valid symbols"}, status_code=400)
+
+    async def lines():
+        try:    # one bulk OHLC download for the whole list
+            await run_blocking(market_provider.prefetch_history, symbols)
+        except Exception:
+            pass
+
+        gate = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def one(sym):
+            async with gate:
+                try:
+                    return {"symbol": sym,
+                            **await run_blocking(build_analysis, sym, window, include_twitter)}
+                except Exception as exc:
+                    return {"symbol": sym, "error": str(exc)}
+
+        tasks = [asyncio.create_task(one(s)) for s in symbols]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield serialize.dumps(await done) + b"\n"
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/history/{symbol}")
+async def history(symbol: str, start: str | None = None, end: str | None = None,
+                  resolution: str = "day"):
+    """
+    Stored daily sentiment (per source) and OHLC for [start, end], ISO
+    dates, default the last year; resolution = day | week | month.
+    Served from the store the poller writes (backend/timeseries.py), never upstream.
+    """
+    if resolution not in RESOLUTIONS:
+        return JSONResponse({"error": f"resolution must be one of {list(RESOLUTIONS)}"},
+                            status_code=400)
     try:
-        unified      = get_unified_sentiment(sym, window, include_twitter)
-        fundamentals = {"pe": unified["pe"], "eps": unified["eps"]}
-
-        # correlation: sentiment(t) vs return(t+1)
-        hist    = unified["stock_history"]
-        returns = hist["Close"].pct_change().shift(-1)
-        corr    = float(unified["daily_sentiment"].corr(returns) or 0)
-
-        return JSONResponse({
-            "fundamentals": fundamentals,
-            "sentiment": {
-                "average_sentiment": unified["average_sentiment"],
-                "trend"            : unified["trend"],
-                "corr"             : corr,
-                "sources"          : unified["sources"],
-                # include series so the React chart can plot them
-                "daily_sentiment"  : unified["daily_sentiment"].to_dict(),
-                "rolling_mean"     : unified["rolling_mean"].to_dict(),
-                "ci_lower"         : unified["ci_lower"].to_dict(),
-                "ci_upper"         : unified["ci_upper"].to_dict(),
-                "stock_history"    : unified["stock_history"]["Close"].to_dict()
-            },
-            "current_price": unified["current_price"],
-            "currency"     : unified["currency"]
-        })
-
-    except Exception as exc:
-        return JSONResponse({"error": str(exc)}, status_code=500)
+        start, end = parse_range(start, end)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    data = await run_blocking(ts_store.range, symbol.upper(), start, end, resolution)
+    return Response(serialize.dumps(data), media_type="application/json")
 
 # --------------------------------------------------------------------
 # 2) OPTIONAL: WebSocket stream (you can wire this in later steps)
 # --------------------------------------------------------------------
-import redis, asyncio
+import redis.asyncio as aioredis
 from typing import DefaultDict
 from collections import defaultdict
 
-r = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+from backend.hub import StreamHub, RESYNC
+from backend import stream_codec, scheduler
+
+r = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 SUBS: DefaultDict[str, set[WebSocket]] = defaultdict(set)
+hub = StreamHub(r, SUBS, queue_size=int(os.getenv("WS_QUEUE_SIZE", 8)))
+# live counts → Redis, read by the poll scheduler (backend/scheduler.py)
+subs_exporter = scheduler.SubsExporter(r, SUBS)
 
 @app.websocket("/ws/{symbol}")
 async def stream_sentiment(ws: WebSocket, symbol: str):
     """
-    Streams JSON snapshots published to Redis channel `stream:<symbol>`.
-    The Celery task in backend/tasks.py pushes updates every 30 s.
+    Streams frames published to Redis channel `stream:<symbol>`: a full
+    snapshot on connect, then deltas (see backend/stream_codec.py).  The
+    Celery poller publishes as often as backend/scheduler.py decides from
+    the watcher counts exported below; a single per-process hub
+    subscription fans them out to every socket in SUBS.
+    Send the text "resync" to get a fresh full frame.
     """
     await ws.accept()
-    SUBS[symbol].add(ws)
+    queue = await hub.join(symbol, ws)
+    if len(SUBS[symbol]) == 1:
+        subs_exporter.nudge()                 # first watcher here: tell the scheduler now
+    binary = stream_codec.FORMAT == "msgpack"
+
+    async def sender():
+        while True:
+            frame = await queue.get()
+            if frame is RESYNC:
+                frame = await hub.latest(symbol)
+                if frame is None:
+                    continue
+            if binary:
+                await ws.send_bytes(frame)
+            else:
+                await ws.send_text(frame.decode("utf-8"))
 
-    pubsub = r.pubsub()
-    pubsub.subscribe(f"stream:{symbol}")
+    async def receiver():                     # returns once the client leaves
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                return
+            if msg.get("text") == "resync":
+                hub.resync(ws)
 
+    tasks = [asyncio.create_task(sender()), asyncio.create_task(receiver())]
     try:
-        async for msg in pubsub.listen():
-            if msg["type"] == "message":
-                await ws.send_text(msg["data"].decode("utf-8"))
-    except WebSocketDisconnect:
-        SUBS[symbol].discard(ws)
-        pubsub.close()
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await hub.leave(symbol, ws)
+
+
+# gunicorn --preload imports this module once in the master: load the models
+# there so every forked worker shares them copy-on-write
+if os.getenv("PRELOAD_MODELS") == "1":
+    from backend.models.registry import registry
+    startup.warmup()
+    registry.freeze()
+
+@app.on_event("startup")
+async def _startup():
+    # accept traffic right away; nltk / praw / yfinance load on the pool
+    # (WARMUP=sync waits for them, WARMUP=off leaves it to first use)
+    subs_exporter.start()
+    mode = os.getenv("WARMUP", "background")
+    if mode == "sync":
+        await run_blocking(startup.warmup)
+    elif mode != "off":
+        asyncio.get_running_loop().run_in_executor(BLOCKING_POOL, startup.warmup)
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    BLOCKING_POOL.shutdown(wait=False, cancel_futures=True)
+    scoring_pool.shutdown()
+    await subs_exporter.close()
+    await hub.close()
+    await r.aclose()
 
 # --------------------------------------------------------------------
 # 3) Dev entry-point  (use uvicorn, not Flask’s built-in server)
@@ -110,3 +265,44 @@ if __name__ == "__main__":
 @app.get("/")
 async def root():
     return {"status": "ok", "msg": "Stock-Sentiment API"}
+
+@app.get("/stats/scores")
+async def score_cache_stats():
+    """Hit rate of the persistent sentiment score cache."""
+    from backend.models.score_cache import score_cache
+    return await run_blocking(score_cache.stats)
+
+@app.get("/stats/startup")
+async def startup_stats():
+    """Per-module import / warmup timings for this process."""
+    return startup.report()
+
+@app.get("/stats/schedule")
+async def schedule_stats():
+    """Streamed symbols the poll scheduler tracks, with watchers and next poll."""
+    return await run_blocking(scheduler.status, sync_redis)
+
+@app.get("/stats/models")
+async def model_stats():
+    """Shared model registry: what is loaded, load times and this worker's memory."""
+    from backend.models.registry import registry
+    return registry.stats()
+
+# ─── metrics ─────────────────────────────────────────────────────────
+from backend.cache     import r as sync_redis
+from backend.ratelimit import limits
+
+CELERY_QUEUE = os.getenv("CELERY_QUEUE", "celery")
+metrics.gauge("celery_queue_length", "Tasks waiting in the Celery broker queue",
+              lambda: sync_redis.llen(CELERY_QUEUE))
+metrics.gauge("circuit_open", "1 while a provider's circuit breaker is not closed",
+              lambda: {p: int(state != 'closed') for p, state in limits.status().items()},
+              label="provider")
+metrics.gauge("ws_subscribers", "Open WebSocket subscribers in this process",
+              lambda: {sym: len(socks) for sym, socks in SUBS.items()}, label="symbol")
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition for this worker process."""
+    return PlainTextResponse(await run_blocking(metrics.render),
+                             media_type="text/plain; version=0.0.4")
@@ -0,0 +1,189 @@
+# backend/metrics.py
+"""
+In-process metrics in Prometheus text format (served at /metrics).
+
+    with span("score"): ...                        # stage_seconds{stage="score"}
+    CACHE.inc(source="quote", result="hit")
+    UPSTREAM.inc(provider="reddit", outcome="rate_limited")
+
+Spans also land in the per-request list opened by `collect()`, which
+/analyze turns into a Server-Timing header (wall time per stage).  Use `propagate(fn)` when
+handing work to another thread so its spans reach that list.
+"""
+import time, functools, threading, contextvars
+from contextlib import contextmanager
+
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ''
+    esc = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for v in values)
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(names, esc)) + '}'
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values = {}
+        self._lock   = threading.Lock()
+
+    def inc(self, n: float = 1, **labels) -> None:
+        key = tuple(labels.get(k, '') for k in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def render(self) -> list:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        out += [f"{self.name}{_labels(self.labels, k)} {v}" for k, v in items]
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = _BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._values = {}                     # labels → [bucket counts..., sum, count]
+        self._lock   = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(k, '') for k in self.labels)
+        with self._lock:
+            v = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    v[i] += 1
+            v[-2] += value
+            v[-1] += 1
+
+    def render(self) -> list:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        for key, v in items:
+            for b, c in zip((*self.buckets, '+Inf'), (*v[:-2], v[-1])):
+                out.append(f"{self.name}_bucket{_labels((*self.labels, 'le'), (*key, b))} {c}")
+            out.append(f"{self.name}_sum{_labels(self.labels, key)} {round(v[-2], 6)}")
+            out.append(f"{self.name}_count{_labels(self.labels, key)} {v[-1]}")
+        return out
+
+
+class Gauge:
+    """Read at scrape time from `fn()` (a number or {label value: number})."""
+
+    def __init__(self, name: str, help: str, fn, label: str | None = None):
+        self.name, self.help, self.fn, self.label = name, help, fn, label
+
+    def render(self) -> list:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.fn()
+        except Exception:
+            return out
+        if isinstance(value, dict):
+            out += [f"{self.name}{_labels((self.label,), (k,))} {v}" for k, v in value.items()]
+        else:
+            out.append(f"{self.name} {value}")
+        return out
+
+
+REGISTRY = []
+
+
+def _register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def counter(name, help, labels=()):
+    return _register(Counter(name, help, tuple(labels)))
+
+
+def histogram(name, help, labels=(), buckets=_BUCKETS):
+    return _register(Histogram(name, help, tuple(labels), buckets))
+
+
+def gauge(name, help, fn, label=None):
+    return _register(Gauge(name, help, fn, label))
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return '\n'.join(lines) + '\n'
+
+
+# ---------- the metrics themselves ----------
+STAGES   = histogram("stage_seconds", "Wall time per pipeline stage", ("stage",))
+CACHE    = counter("cache_requests_total", "Cache lookups by result", ("source", "result"))
+UPSTREAM = counter("upstream_requests_total",
+                   "Upstream calls by outcome (ok, error, rate_limited, unavailable, quota, circuit_open, backoff)",
+                   ("provider", "outcome"))
+UPSTREAM_SECONDS = histogram("upstream_seconds", "Upstream call latency", ("provider",))
+SOURCES  = counter("source_fetches_total", "Fan-out source jobs by status", ("source", "status"))
+REQUESTS = counter("http_requests_total", "API requests", ("route", "status"))
+
+
+# ---------- spans / Server-Timing ----------
+_spans = contextvars.ContextVar("spans", default=None)
+
+
+@contextmanager
+def collect():
+    """Gather every span recorded in this context (and propagated threads)."""
+    spans = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def record(stage: str, seconds: float, end: float | None = None) -> None:
+    """A finished span; `end` is a perf_counter() reading (default: now)."""
+    STAGES.observe(seconds, stage=stage)
+    spans = _spans.get()
+    if spans is not None:
+        end = time.perf_counter() if end is None else end
+        spans.append((stage, end - seconds, end))
+
+
+@contextmanager
+def span(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        t1 = time.perf_counter()
+        record(stage, t1 - t0, t1)
+
+
+def propagate(fn):
+    """
+    Bind fn to a copy of the caller's context so spans recorded in a pool
+    thread are kept.  One call per submitted job: a context can only be
+    entered by one thread at a time.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def server_timing(spans: list) -> str:
+    """
+    `Server-Timing` value: wall time per stage.  Repeated spans of a stage
+    (e.g. score in the parallel source jobs) count overlapping time once.
+    """
+    walls = {}
+    for stage, start, end in spans:
+        walls.setdefault(stage, []).append((start, end))
+    out = []
+    for stage, iv in walls.items():
+        total, reach = 0.0, float('-inf')
+        for start, end in sorted(iv):
+            if end > reach:
+                total += end - max(start, reach)
+                reach  = end
+        out.append(f"{stage};dur={total * 1000:.1f}")
+    return ', '.join(out)
@@ -1,24 +1,26 @@
-import re, pandas as pd, nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.sentiment import SentimentIntensityAnalyzer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-nltk.download('vader_lexicon', quiet=True)
+import re, numpy as np, pandas as pd
+from backend.metrics import span
+from .registry import registry
+from . import scoring_pool
+from .score_cache import score_cache
 
 class EnhancedSentimentAnalyzer:
+    # models come from the per-process registry: one VADER lexicon shared by
+    # every analyzer, and nltk is only imported once something is scored
     def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
-        self.vectorizer = TfidfVectorizer(max_features=1000)
-        self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.stop_words = set(stopwords.words('english'))
         self.quality_threshold = 0.5
 
+    @property
+    def sia(self):
+        return registry.get('vader')
+
+    @property
+    def stop_words(self) -> frozenset:
+        return registry.get('stopwords')
+
     # ---------- helpers ----------
     def preprocess_text(self, txt: str) -> str:
+        from nltk.tokenize import word_tokenize
         txt = re.sub(r'[^a-zA-Z\s]', '', str(txt).lower())
         tokens = [w for w in word_tokenize(txt) if w not in self.stop_words]
         return ' '.join(tokens)
@@ -26,19 +28,70 @@ class EnhancedSentimentAnalyzer:
     def calculate_quality_score(self, row):
         score  = 0.3 if len(row['text']) > 100 else 0
         score += 0.3 if row['score'] > 10   else 0
-        score += abs(self.sia.polarity_scores(row['text'])['compound']) * 0.4
+        score += abs(self.polarity(row['text'])) * 0.4
         return score
 
     def filter_low_quality(self, df: pd.DataFrame) -> pd.DataFrame:
-        df['quality_score'] = df.apply(self.calculate_quality_score, axis=1)
+        if 'quality_score' not in df:
+            _, df['quality_score'] = self.score_batch(df['text'], df['score'])
         return df[df.quality_score > self.quality_threshold]
 
     # ---------- sentiment ----------
     def score(self, txt: str) -> float:
         if not txt:
             return 0
-        base = self.sia.polarity_scores(txt)['compound'] * 0.7
+        base = self.polarity(txt) * 0.7
         bonus  = (len(txt) / 1000) * 0.1
         bonus += 0.1 if '!' in txt else 0
         bonus -= 0.1 if '?' in txt else 0
         return base + bonus
+
+    # ---------- batch API ----------
+    def polarity(self, txt: str) -> float:
+        return float(self.polarity_batch([txt])[0])
+
+    def polarity_batch(self, texts) -> np.ndarray:
+        """
+        VADER compound per text.  Each distinct text is scored once, and
+        only if the persistent score cache has not seen it before.
+        """
+        texts = [str(t) if t else '' for t in texts]
+        uniq, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+
+        known  = score_cache.get_many([t for t in uniq if t])
+        todo   = [t for t in uniq if t and t not in known]
+        if todo and not scoring_pool.sharded(len(todo)):
+            self.sia                          # first-use model load is not scoring time
+        with span("score"):
+            # inline, or sharded over SCORING_PROCESSES for large batches
+            fresh = dict(zip(todo, scoring_pool.compound(todo)))
+        score_cache.put_many(fresh)
+
+        compound = np.fromiter((known.get(t, fresh.get(t, 0.0)) for t in uniq),
+                               dtype=float, count=len(uniq))
+        return compound[inverse]
+
+    def score_batch(self, texts, scores=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorised `score` + `calculate_quality_score` for many texts.
+        scores = per-text upvotes (quality term), optional
+        Returns (sentiment, quality) arrays aligned with `texts`.
+        """
+        texts    = pd.Series(list(texts), dtype=object).fillna('').astype(str)
+        compound = self.polarity_batch(texts)
+        length   = texts.str.len().to_numpy(dtype=float)
+        empty    = length == 0
+
+        sentiment  = compound * 0.7 + (length / 1000) * 0.1
+        sentiment += np.where(texts.str.contains('!', regex=False), 0.1, 0)
+        sentiment -= np.where(texts.str.contains('?', regex=False), 0.1, 0)
+        sentiment[empty] = 0
+
+        votes    = np.zeros(len(texts)) if scores is None else scores
+        quality  = np.where(length > 100, 0.3, 0) + self.vote_quality(votes)
+        quality += np.abs(compound) * 0.4
+        return sentiment, quality
+
+    def vote_quality(self, votes) -> np.ndarray:
+        """Upvote term of the quality score (added on read for stored posts)."""
+        return np.where(np.asarray(votes, dtype=float) > 10, 0.3, 0)
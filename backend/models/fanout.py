@@ -0,0 +1,100 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from backend.metrics import SOURCES, record, propagate
+
+# per-provider concurrency budgets, shared by every fan-out in the process,
+# so a 500-symbol batch can't open 500 parallel NewsAPI calls.  Each budget
+# is its own executor: a job waiting for its provider sits in that queue,
+# not on a thread another provider could use, and is cancelled there if
+# its deadline passes first.
+BUDGETS = {
+    'reddit' : int(os.getenv("BUDGET_REDDIT",  4)),
+    'twitter': int(os.getenv("BUDGET_TWITTER", 2)),
+    'news'   : int(os.getenv("BUDGET_NEWS",    4)),
+    'market' : int(os.getenv("BUDGET_YAHOO",   8)),
+}
+_POOLS = {p: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"fanout-{p}")
+          for p, n in BUDGETS.items()}
+
+# jobs without a budget; sized for every API worker fanning out at once
+JOBS_PER_CALL = 4
+_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FANOUT_WORKERS",
+                              int(os.getenv("API_BLOCKING_WORKERS", 8)) * JOBS_PER_CALL)),
+    thread_name_prefix="fanout",
+)
+
+DEFAULT_TIMEOUT = float(os.getenv("FANOUT_TIMEOUT", 20))
+
+
+class _Started(threading.Event):
+    """Set by the job when it leaves its provider's queue."""
+    at = None
+
+    def mark(self) -> None:
+        self.at = time.perf_counter()
+        self.set()
+
+
+def _timed(started, fn, args):
+    started.mark()
+    t0 = started.at
+    try:
+        return fn(*args), None, time.perf_counter() - t0
+    except Exception as e:
+        return None, e, time.perf_counter() - t0
+
+
+def fan_out(jobs: dict, timeouts: dict | None = None,
+            provider: str | None = None) -> tuple[dict, dict]:
+    """
+    Run every job concurrently and wait at most each job's timeout.
+    jobs     = {name: (fn, args, fallback)}
+    timeouts = {name: seconds}  (missing names use FANOUT_TIMEOUT)
+    provider = budget every job runs under (default: the job's own name)
+    Returns ({name: result-or-fallback}, {name: {ms, status}}).
+    A late or failing job yields its fallback instead of blocking the rest.
+    Every timeout runs from the call, so time queued behind a provider
+    budget is spent from the job's own; a job still queued at its deadline
+    is cancelled.
+    """
+    timeouts = timeouts or {}
+    start    = time.perf_counter()
+    started  = {name: _Started() for name in jobs}
+    futures  = {name: _POOLS.get(provider or name, _POOL).submit(propagate(_timed),
+                                                                 started[name], fn, args)
+                for name, (fn, args, _) in jobs.items()}
+
+    results, timings = {}, {}
+    for name in sorted(jobs, key=lambda n: timeouts.get(n, DEFAULT_TIMEOUT)):
+        fut      = futures[name]
+        fallback = jobs[name][2]
+        status   = None
+        deadline = start + timeouts.get(name, DEFAULT_TIMEOUT)
+        try:
+            value, err, took = fut.result(timeout=max(0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            # never left the provider's queue: drop it there
+            status = 'queued' if not started[name].is_set() and fut.cancel() else 'timeout'
+        if status is not None:
+            results[name] = fallback
+            timings[name] = {'ms': round((time.perf_counter() - start) * 1000, 1),
+                             'status': status}
+            SOURCES.inc(source=provider or name, status=status)
+            now = time.perf_counter()
+            record(f"fetch_{provider or name}", now - (started[name].at or start), now)
+            continue
+
+        if err is not None:
+            results[name] = fallback
+            timings[name] = {'ms': round(took * 1000, 1), 'status': 'error',
+                             'error': str(err)}
+        else:
+            results[name] = value
+            timings[name] = {'ms': round(took * 1000, 1), 'status': 'ok'}
+        SOURCES.inc(source=provider or name, status=timings[name]['status'])
+        record(f"fetch_{provider or name}", took, started[name].at + took)
+
+    return results, timings
@@ -1,11 +1,10 @@
 import pandas as pd
-import yfinance as yf
+from backend.cache import cached
+from .market_data import provider
 
 class FundamentalsFetcher:
-    def get_fundamentals(self, symbol: str) -> dict:
-        ticker = yf.Ticker(symbol)
-        info   = ticker.info
-
+    @staticmethod
+    def from_info(info: dict) -> dict:
         pe  = info.get("forwardPE") or info.get("trailingPE")
         eps = info.get("forwardEps") or info.get("trailingEps")
 
@@ -17,3 +16,7 @@ class FundamentalsFetcher:
             "eps": eps,
             "earnings_dates": earnings_dates
         }
+
+    @cached(source='fundamentals')
+    def get_fundamentals(self, symbol: str) -> dict:
+        return self.from_info(provider.info(symbol))
@@ -0,0 +1,99 @@
+import pandas as pd
+from typing import TYPE_CHECKING
+from backend.cache import cached
+from backend.ratelimit import limits
+from .fanout import fan_out
+
+if TYPE_CHECKING:
+    import yfinance as yf
+
+# the subset of Ticker.info the fetchers read; keeps cache entries small
+INFO_FIELDS = (
+    'currentPrice', 'currency',
+    'trailingPE', 'forwardPE', 'trailingEps', 'forwardEps',
+    'earningsDate',
+)
+
+
+def _naive(df: pd.DataFrame) -> pd.DataFrame:
+    # drop any timezone info so it can align with the daily sentiment index
+    if hasattr(df.index, 'tz') and df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+class MarketDataProvider:
+    """
+    One Yahoo pass per symbol: quote, fundamentals and OHLC history.
+    `.info` is fetched at most once per quote TTL and serves both
+    StockDataFetcher and FundamentalsFetcher.
+    """
+
+    def ticker(self, symbol: str) -> 'yf.Ticker':
+        # a fresh Ticker per fetch: yfinance memoises `.info` on the instance,
+        # so a kept one would never see a new quote.  Tickers are cheap,
+        # the HTTP session behind them is shared.
+        import yfinance as yf                 # deferred: imported on first use
+        return yf.Ticker(symbol)
+
+    @cached(source='quote')
+    def info(self, symbol: str) -> dict:
+        info = limits.call('yahoo', lambda: self.ticker(symbol).info) or {}
+        return {k: info.get(k) for k in INFO_FIELDS}
+
+    @cached(source='history')
+    def history(self, symbol: str, days: int = 30) -> pd.DataFrame:
+        return _naive(limits.call('yahoo', self.ticker(symbol).history, period=f"{days}d"))
+
+    def snapshot(self, symbol: str, days: int = 30) -> dict:
+        # either half is still worth having if the other one fails
+        try:
+            info = self.info(symbol)
+        except Exception:
+            info = {}
+        try:
+            history = self.history(symbol, days)
+        except Exception:
+            history = pd.DataFrame(columns=['Close'], dtype=float)
+        return {'info': info, 'history': history}
+
+    # ---------- batched mode (Celery poller / watchlists) ----------
+    def prefetch_history(self, symbols: list, days: int = 30) -> None:
+        """
+        One yf.download for the symbols whose cached history has expired,
+        primed into the history cache.  Fresh ones cost nothing.
+        """
+        symbols = [s for s in dict.fromkeys(symbols) if not self.history.fresh(self, s, days)]
+        if not symbols:
+            return
+
+        import yfinance as yf
+        bulk = limits.call('yahoo', yf.download, symbols, period=f"{days}d",
+                           group_by='ticker', auto_adjust=True, threads=True,
+                           progress=False)
+        for sym in symbols:
+            if isinstance(bulk.columns, pd.MultiIndex):
+                if sym not in bulk.columns.get_level_values(0):
+                    continue
+                df = bulk[sym]
+            else:
+                df = bulk
+            df = _naive(df.dropna(how='all').copy())
+            df.columns.name = None
+            if not df.empty:
+                self.history.prime(df, self, sym, days)
+
+    def snapshots(self, symbols: list, days: int = 30) -> dict:
+        """
+        Bulk OHLC via prefetch_history, then `.info` per symbol in
+        parallel within the Yahoo budget.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        self.prefetch_history(symbols, days)
+        infos, _ = fan_out({sym: (self.info, (sym,), {}) for sym in symbols},
+                           provider='market')
+        return {sym: {'info': infos[sym], 'history': self.history(sym, days)}
+                for sym in symbols}
+
+
+provider = MarketDataProvider()
@@ -1,22 +1,45 @@
 # src/models/news_sentiment.py
 
 import os
+import logging
 import requests
 import pandas as pd
 from dotenv import load_dotenv
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
+from backend.cache import cached
+from backend.metrics import span
+from backend.ratelimit import limits, RateLimited
+from .enhanced_sentiment import EnhancedSentimentAnalyzer
 
-# ensure VADER lexicon is available
-nltk.download("vader_lexicon", quiet=True)
 load_dotenv()
+log = logging.getLogger(__name__)
 
 
 class NewsSentimentAnalyzer:
     def __init__(self):
         self.api_key = os.getenv("NEWS_API_KEY")
         self.base_url = "https://newsapi.org/v2/everything"
-        self.sia = SentimentIntensityAnalyzer()
+        self.session = requests.Session()      # keep-alive across calls
+        self.enh = EnhancedSentimentAnalyzer()
+
+    @cached(source='news')
+    def _fetch_articles(self, symbol: str, limit: int) -> list:
+        params = {
+            "q": f"{symbol} stock",
+            "apiKey": self.api_key,
+            "pageSize": limit,
+            "language": "en",
+            "sortBy": "relevancy",
+        }
+        resp = limits.call("newsapi", self._get, params)
+        if resp.get("status") == "error":       # don't cache quota / key errors
+            raise RuntimeError(resp.get("message", "NewsAPI error"))
+        return resp.get("articles", [])
+
+    def _get(self, params: dict) -> dict:
+        resp = self.session.get(self.base_url, params=params, timeout=10)
+        if resp.status_code == 429:
+            raise RateLimited("NewsAPI rate limited")
+        return resp.json()
 
     def analyze_sentiment(self, symbol: str, limit: int = 20) -> dict:
         """
@@ -24,38 +47,28 @@ class NewsSentimentAnalyzer:
         and return a dict matching Reddit/Twitter analyzer style.
         """
         try:
-            params = {
-                "q": f"{symbol} stock",
-                "apiKey": self.api_key,
-                "pageSize": limit,
-                "language": "en",
-                "sortBy": "relevancy",
-            }
-            resp = requests.get(self.base_url, params=params).json()
-            articles = resp.get("articles", [])
+            articles = self._fetch_articles(symbol, limit)
             if not articles:
                 return {"success": False, "error": "No articles found"}
 
-            # build a time series if desired
-            times = []
-            scores = []
-            # 🔄 full patched block
-            for art in articles:
-                text = (art.get("title") or "") + " " + (art.get("description") or "")
-                score = self.sia.polarity_scores(text)["compound"]
-                scores.append(score)
-                times.append(pd.to_datetime(art.get("publishedAt")))
+            texts  = [(art.get("title") or "") + " " + (art.get("description") or "")
+                      for art in articles]
+            scores = self.enh.polarity_batch(texts)
+            times  = [pd.to_datetime(art.get("publishedAt")) for art in articles]
 
             df = pd.DataFrame({"sentiment": scores}, index=pd.to_datetime(times))
-            daily = df["sentiment"].resample("D").mean()
+            with span("resample"):
+                daily = df["sentiment"].resample("D").mean()
+                count = df["sentiment"].resample("D").count()
 
             return {
                 "success": True,
                 "average_sentiment": float(df["sentiment"].mean()),
                 "post_count": len(df),
                 "daily_sentiment": daily,
+                "daily_counts": count,
             }
 
         except Exception as e:
-            print(f"News sentiment error: {e}")
+            log.warning("News sentiment error: %s", e)
             return {"success": False, "error": str(e)}
@@ -0,0 +1,111 @@
+import os, time
+import pandas as pd
+from backend.cache import r
+from .state_store import MirroredStore
+
+RETENTION_DAYS = int(os.getenv("REDDIT_RETENTION_DAYS", 30))
+
+
+class SymbolPosts:
+    """
+    Everything we have ingested for one symbol: every post seen, with its
+    sentiment, its vote-independent quality and its latest upvote count,
+    plus the created_utc watermark.  The quality filter is applied on read,
+    so a post that gains upvotes after it was first seen starts counting.
+    """
+
+    VERSION = 2                               # bump when the row shape changes
+
+    def __init__(self):
+        self.posts      = {}                  # id → row (every post seen)
+        self.watermark  = 0.0                 # newest created_utc ingested
+        self.fetched_at = 0.0
+
+    # ---------- incremental updates ----------
+    def add(self, row: dict) -> None:
+        if row['id'] in self.posts:
+            return
+        self.posts[row['id']] = row
+        self.watermark = max(self.watermark, row['created_ts'])
+
+    def recent(self, since: float, limit: int = 100) -> list:
+        """Ids of the newest posts created after `since` (upvote refresh)."""
+        rows = sorted((p for p in self.posts.values() if p['created_ts'] >= since),
+                      key=lambda p: p['created_ts'], reverse=True)
+        return [p['id'] for p in rows[:limit]]
+
+    def set_votes(self, votes: dict) -> None:
+        for pid, n in votes.items():
+            if pid in self.posts:
+                self.posts[pid]['score'] = n
+
+    def prune(self, now: float, days: int = RETENTION_DAYS) -> None:
+        cutoff = now - days * 86400
+        for pid in [p for p, row in self.posts.items() if row['created_ts'] < cutoff]:
+            del self.posts[pid]
+
+    # ---------- read side (over the posts that pass the filter) ----------
+    @staticmethod
+    def _day(ts: float) -> str:
+        return time.strftime('%Y-%m-%d', time.gmtime(ts))
+
+    @staticmethod
+    def _bucket(v: float) -> str:
+        return 'positive' if v > 0 else ('negative' if v < 0 else 'neutral')
+
+    @classmethod
+    def daily(cls, rows: list) -> tuple[pd.Series, pd.Series]:
+        """Daily mean & count, gap days included (same shape as resample('D'))."""
+        day_sum, day_cnt = {}, {}
+        for row in rows:
+            day = cls._day(row['created_ts'])
+            day_sum[day] = day_sum.get(day, 0.0) + row['sentiment']
+            day_cnt[day] = day_cnt.get(day, 0) + 1
+        if not day_cnt:
+            return pd.Series(dtype=float), pd.Series(dtype=int)
+        days  = sorted(day_cnt)
+        idx   = pd.DatetimeIndex(pd.to_datetime(days), name='date')
+        cnt   = pd.Series([day_cnt[d] for d in days], index=idx, name='sentiment')
+        mean  = pd.Series([day_sum[d] / day_cnt[d] for d in days], index=idx, name='sentiment')
+        full  = pd.date_range(idx[0], idx[-1], freq='D', name='date')
+        return mean.reindex(full), cnt.reindex(full, fill_value=0)
+
+    @classmethod
+    def distribution(cls, rows: list) -> dict:
+        dist = {}
+        for row in rows:
+            b = cls._bucket(row['sentiment'])
+            dist[b] = dist.get(b, 0) + 1
+        return dist
+
+    # ---------- persistence ----------
+    def to_state(self) -> dict:
+        return {'version': self.VERSION,
+                **{k: getattr(self, k) for k in ('posts', 'watermark', 'fetched_at')}}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'SymbolPosts':
+        obj = cls()
+        if state.get('version') != cls.VERSION:
+            return obj                        # older layout: ingest afresh
+        for k in ('posts', 'watermark', 'fetched_at'):
+            setattr(obj, k, state[k])
+        return obj
+
+
+class PostStore(MirroredStore):
+    """Per-symbol SymbolPosts under `posts:<symbol>`."""
+
+    stamp = 'fetched_at'
+
+    def __init__(self, client):
+        super().__init__(client, "posts", RETENTION_DAYS * 86400)
+
+    def new(self, symbol: str) -> SymbolPosts:
+        return SymbolPosts()
+
+    def load(self, state: dict) -> SymbolPosts:
+        return SymbolPosts.from_state(state)
+
+
+post_store = PostStore(r)
@@ -1,68 +1,117 @@
 import os
 import re
+import time
+import functools
+import numpy as np
 import pandas as pd
-import praw
 from datetime import datetime
 from dotenv import load_dotenv
+from backend.cache import TTLS, ProviderUnavailable
+from backend.ratelimit import limits
+from backend.metrics import span
 from .enhanced_sentiment import EnhancedSentimentAnalyzer
+from .post_store import post_store
 
 load_dotenv()
 
+# posts younger than this get their upvotes re-read on every ingest
+VOTE_REFRESH_HOURS = float(os.getenv("REDDIT_VOTE_REFRESH_HOURS", 48))
+
 class RedditSentimentAnalyzer:
     def __init__(self):
-        self.reddit = praw.Reddit(
+        self.enh = EnhancedSentimentAnalyzer()
+        self._daily_series = pd.Series(dtype=float)
+
+    @functools.cached_property
+    def reddit(self):
+        # praw is only imported (and the client built) on the first fetch
+        import praw
+        return praw.Reddit(
             client_id=os.getenv('REDDIT_CLIENT_ID'),
             client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
             user_agent=os.getenv('REDDIT_USER_AGENT')
         )
-        self.enh = EnhancedSentimentAnalyzer()
-        self._daily_series = pd.Series(dtype=float)
 
     def _clean(self, txt: str) -> str:
         return re.sub(r'http\S+|\[[^\]]+\]\([^)]+\)|[^\w\s]', '', str(txt))
 
-    def _fetch_posts(self, symbol: str, limit: int) -> pd.DataFrame:
+    def _fetch_new_posts(self, symbol: str, limit: int, since: float, seen) -> list:
+        """Newest-first search that stops at the first post we already have."""
         rows = []
         for post in self.reddit.subreddit('stocks+investing+wallstreetbets') \
-                               .search(f'{symbol} stock', limit=limit, time_filter='month'):
+                               .search(f'{symbol} stock', sort='new', limit=limit,
+                                       time_filter='month'):
+            if post.id in seen or post.created_utc < since:
+                break
             rows.append({
+                'id': post.id,
                 'title': post.title,
                 'text': self._clean(f"{post.title} {post.selftext}"),
                 'score': post.score,
+                'created_ts': float(post.created_utc),
                 'created_utc': datetime.utcfromtimestamp(post.created_utc),
                 'url': f'https://reddit.com{post.permalink}',
                 'subreddit': post.subreddit.display_name
             })
-        return pd.DataFrame(rows)
+        return rows
 
-    def analyze_sentiment(self, symbol: str, limit: int = 120) -> dict:
-        df = self._fetch_posts(symbol, limit)
-        if df.empty:
-            return {'success': False, 'error': f'No Reddit posts for {symbol}'}
+    def _fetch_votes(self, ids: list) -> dict:
+        """Current upvotes for up to 100 posts in one /api/info request."""
+        return {p.id: p.score for p in self.reddit.info(fullnames=[f"t3_{i}" for i in ids])}
 
-        # score & filter
-        df['sentiment'] = df['text'].apply(self.enh.score)
-        df = self.enh.filter_low_quality(df)
+    def _ingest(self, symbol: str, limit: int, posts) -> None:
+        """Pull only posts newer than the watermark, refresh recent upvotes."""
+        now = time.time()
+        if now - posts.fetched_at < TTLS['reddit']:
+            return
+        try:
+            rows = limits.call('reddit', self._fetch_new_posts,
+                               symbol, limit, posts.watermark, posts.posts)
+        except ProviderUnavailable:
+            return                              # out of quota: serve the store
+        recent = posts.recent(now - VOTE_REFRESH_HOURS * 3600)
+        if recent:
+            try:
+                posts.set_votes(limits.call('reddit', self._fetch_votes, recent))
+            except Exception:
+                pass                            # keep the last known upvotes
+        if rows:
+            df = pd.DataFrame(rows)
+            # quality without the upvote term: votes change, it is added on read
+            df['sentiment'], df['quality'] = self.enh.score_batch(df['text'])
+            for row in df.to_dict('records'):
+                posts.add(row)
+        posts.prune(now)
+        posts.fetched_at = now
+        post_store.save(posts, symbol)
 
-        # build daily sentiment & post‐counts
-        df['date'] = pd.to_datetime(df['created_utc'])
-        daily_sent  = df.set_index('date')['sentiment'].resample('D').mean()
-        daily_count = df.set_index('date')['sentiment'].resample('D').count()
-        self._daily_series = daily_sent
+    def _kept(self, posts) -> list:
+        rows = list(posts.posts.values())
+        if not rows:
+            return []
+        quality = (np.fromiter((p['quality'] for p in rows), dtype=float, count=len(rows))
+                   + self.enh.vote_quality([p['score'] for p in rows]))
+        return [p for p, q in zip(rows, quality) if q > self.enh.quality_threshold]
 
-        # distribution & top posts
-        dist = (
-            df['sentiment']
-              .apply(lambda v: 'positive' if v>0 else ('negative' if v<0 else 'neutral'))
-              .value_counts().to_dict()
-        )
-        top = df.nlargest(5, 'score').to_dict('records')
+    def analyze_sentiment(self, symbol: str, limit: int = 120) -> dict:
+        with post_store.open(symbol) as posts:
+            self._ingest(symbol, limit, posts)
+            if not posts.posts:
+                return {'success': False, 'error': f'No Reddit posts for {symbol}'}
+            kept = self._kept(posts)
+
+        # daily sentiment & post-counts over the posts that pass the filter now
+        with span("resample"):
+            daily_sent, daily_count = posts.daily(kept)
+        n    = len(kept)
+        top  = sorted(kept, key=lambda p: p['score'], reverse=True)[:5]
 
+        self._daily_series = daily_sent
         return {
             'success'               : True,
-            'average_sentiment'     : float(df['sentiment'].mean()),
-            'post_count'            : len(df),
-            'sentiment_distribution': dist,
+            'average_sentiment'     : float(sum(p['sentiment'] for p in kept) / n) if n else float('nan'),
+            'post_count'            : n,
+            'sentiment_distribution': posts.distribution(kept),
             'top_posts'             : top,
             'daily_sentiment'       : daily_sent,
             'daily_counts'          : daily_count
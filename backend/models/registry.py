@@ -0,0 +1,84 @@
+import gc, os, time, threading
+from backend.startup import ensure_nltk
+
+
+def _vader():
+    ensure_nltk()
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+def _stopwords():
+    ensure_nltk()
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+def rss_mb() -> dict:
+    """Resident / proportional / shared memory of this process (Linux), MB."""
+    out = {}
+    try:
+        with open('/proc/self/smaps_rollup') as fh:
+            for line in fh:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty'):
+                    out[key.lower()] = round(int(rest.split()[0]) / 1024, 1)
+    except OSError:
+        import resource                        # peak only, but portable
+        out['max_rss'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return out
+
+
+class ModelRegistry:
+    """
+    Lexicons / models loaded once per process and shared read-only by
+    every analyzer.  `preload` in a prefork parent (Celery worker_init,
+    gunicorn --preload) followed by `freeze` keeps those pages shared
+    copy-on-write across the children.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models  = {}
+        self._load_ms = {}
+        self._lock    = threading.Lock()
+        self.frozen   = False
+
+    def register(self, name: str, loader) -> None:
+        self._loaders[name] = loader
+
+    def get(self, name: str):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                t0 = time.perf_counter()
+                self._models[name]  = self._loaders[name]()
+                self._load_ms[name] = round((time.perf_counter() - t0) * 1000, 1)
+            return self._models[name]
+
+    def preload(self, *names) -> None:
+        for name in names or self._loaders:
+            self.get(name)
+
+    def freeze(self) -> None:
+        # move everything allocated so far out of the GC's reach: collections
+        # in the children would otherwise touch (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+        self.frozen = True
+
+    def stats(self) -> dict:
+        return {
+            'pid'     : os.getpid(),
+            'loaded'  : sorted(self._models),
+            'load_ms' : dict(self._load_ms),
+            'frozen'  : self.frozen,
+            'memory'  : rss_mb(),
+        }
+
+
+registry = ModelRegistry()
+registry.register('vader',     _vader)
+registry.register('stopwords', _stopwords)
@@ -0,0 +1,243 @@
+import os, math, time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from backend.cache import r
+from .state_store import MirroredStore
+
+MIN_PERIODS  = 3            # same as rolling(window, min_periods=3)
+MIN_CI_POSTS = 5            # CI only on days with at least this many posts
+BULLISH      = 0.20
+BEARISH      = -0.20
+ROLLING_TTL  = int(os.getenv("ROLLING_TTL", 7 * 86400))
+
+NAN = float('nan')
+
+
+class Welford:
+    """Running count / mean / M2 with add and remove; NaNs are skipped like pandas."""
+
+    __slots__ = ('n', 'mean', 'm2')
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def add(self, x: float) -> None:
+        if x != x:
+            return
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2   += d * (x - self.mean)
+
+    def remove(self, x: float) -> None:
+        if x != x:
+            return
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        mean = (self.n * self.mean - x) / (self.n - 1)
+        self.m2   = max(0.0, self.m2 - (x - mean) * (x - self.mean))
+        self.mean = mean
+        self.n   -= 1
+
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else NAN
+
+
+class CoMoments:
+    """Welford co-moments of (x, y) pairs → Pearson correlation."""
+
+    __slots__ = ('n', 'mx', 'my', 'cxy', 'm2x', 'm2y')
+
+    def __init__(self, n=0, mx=0.0, my=0.0, cxy=0.0, m2x=0.0, m2y=0.0):
+        self.n, self.mx, self.my, self.cxy, self.m2x, self.m2y = n, mx, my, cxy, m2x, m2y
+
+    def add(self, x: float, y: float) -> None:
+        self.n += 1
+        dx, dy   = x - self.mx, y - self.my
+        self.mx += dx / self.n
+        self.my += dy / self.n
+        self.cxy += dx * (y - self.my)
+        self.m2x += dx * (x - self.mx)
+        self.m2y += dy * (y - self.my)
+
+    def remove(self, x: float, y: float) -> None:
+        if self.n <= 1:
+            self.__init__()
+            return
+        mx = (self.n * self.mx - x) / (self.n - 1)
+        my = (self.n * self.my - y) / (self.n - 1)
+        self.cxy -= (x - mx) * (y - self.my)
+        self.m2x  = max(0.0, self.m2x - (x - mx) * (x - self.mx))
+        self.m2y  = max(0.0, self.m2y - (y - my) * (y - self.my))
+        self.mx, self.my = mx, my
+        self.n  -= 1
+
+    def corr(self) -> float:
+        den = math.sqrt(self.m2x * self.m2y)
+        return self.cxy / den if self.n > 1 and den > 1e-12 else 0.0
+
+
+class RollingAggregator:
+    """
+    Volume-weighted rolling mean / std / CI, trend and the sentiment vs
+    next-day-return correlation for one (symbol, window), kept up to date
+    point by point.
+
+    Everything runs on u = mean sentiment × post count.  The volume weight
+    divides by the max daily count, which rescales every day at once, so
+    that division happens only when the series are read.  Correlation is
+    scale-free and uses u directly.
+
+    `update` diffs the incoming daily series against what is held.  New
+    days are appended and revised tail days are retracted and re-added.
+    Each of these costs O(1).  A full rebuild happens only when the first
+    day moves, which is the daily retention prune.
+    """
+
+    def __init__(self, window: int):
+        self.window     = window
+        self.days       = []              # 'YYYY-MM-DD', gap days included
+        self.u          = []              # sentiment × count (NaN on gap days)
+        self.cnt        = []
+        self.rm_u       = []              # rolling mean / std of u per day
+        self.rs_u       = []
+        self.win        = Welford()       # stats of u over the last `window` days
+        self.max_cnt    = 0
+        self.pairs      = {}              # day → [u(t), return(t+1)]
+        self.co         = CoMoments()
+        self.updated_at = 0.0
+
+    # ---------- sentiment side ----------
+    def _append(self, day: str, u: float, c: int) -> None:
+        self.days.append(day)
+        self.u.append(u)
+        self.cnt.append(c)
+        if len(self.u) > self.window:
+            self.win.remove(self.u[-self.window - 1])
+        self.win.add(u)
+        ok = self.win.n >= MIN_PERIODS
+        self.rm_u.append(self.win.mean if ok else NAN)
+        self.rs_u.append(self.win.std() if ok else NAN)
+        self.max_cnt = max(self.max_cnt, c)
+
+    def _retract(self) -> None:
+        self.days.pop()
+        u, c = self.u.pop(), self.cnt.pop()
+        self.rm_u.pop()
+        self.rs_u.pop()
+        self.win.remove(u)
+        back = len(self.u) - self.window     # day that slides back into the window
+        if back >= 0:
+            self.win.add(self.u[back])
+        if c == self.max_cnt:
+            self.max_cnt = max(self.cnt, default=0)
+
+    def _reset(self) -> None:
+        self.days, self.u, self.cnt, self.rm_u, self.rs_u = [], [], [], [], []
+        self.win, self.max_cnt = Welford(), 0
+
+    def update(self, daily_sent: pd.Series, daily_counts: pd.Series) -> None:
+        days = [d.strftime('%Y-%m-%d') for d in daily_sent.index]
+        cnt  = daily_counts.reindex(daily_sent.index, fill_value=0).astype(int).tolist()
+        u    = (daily_sent.to_numpy(dtype=float) * np.asarray(cnt, dtype=float)).tolist()
+
+        if not days or not self.days or days[0] != self.days[0]:
+            self._reset()
+            keep = 0
+        else:
+            n    = min(len(days), len(self.days))
+            a, b = np.asarray(self.u[:n]), np.asarray(u[:n])
+            same = ((a == b) | (np.isnan(a) & np.isnan(b))) \
+                   & (np.asarray(self.cnt[:n]) == np.asarray(cnt[:n])) \
+                   & (np.asarray(self.days[:n]) == np.asarray(days[:n]))
+            keep = n if same.all() else int(np.argmin(same))
+
+        while len(self.days) > keep:
+            self._retract()
+        for i in range(keep, len(days)):
+            self._append(days[i], u[i], cnt[i])
+
+    # ---------- correlation side ----------
+    def update_returns(self, close: pd.Series) -> None:
+        """Re-pair u(t) with return(t+1); only changed pairs touch the moments."""
+        rets  = close.pct_change().shift(-1)
+        ret   = {k.strftime('%Y-%m-%d'): v for k, v in rets.items() if v == v}
+        want  = {d: [x, ret[d]] for d, x in zip(self.days, self.u) if x == x and d in ret}
+
+        for d in [d for d, p in self.pairs.items() if want.get(d) != p]:
+            self.co.remove(*self.pairs.pop(d))
+        for d, p in want.items():
+            if d not in self.pairs:
+                self.pairs[d] = p
+                self.co.add(*p)
+
+    # ---------- read side ----------
+    def trend(self) -> str:
+        for v in reversed(self.rm_u):
+            if v == v:
+                last = v / self.max_cnt if self.max_cnt > 0 else v
+                if   last > BULLISH: return 'Bullish'
+                elif last < BEARISH: return 'Bearish'
+                return 'Neutral'
+        return 'Neutral'
+
+    def result(self) -> dict:
+        idx   = pd.DatetimeIndex(pd.to_datetime(self.days), name='date')
+        scale = self.max_cnt if self.max_cnt > 0 else 1.0
+        rm    = np.asarray(self.rm_u, dtype=float) / scale
+        rs    = np.nan_to_num(np.asarray(self.rs_u, dtype=float)) / scale
+        valid = (np.asarray(self.cnt) >= MIN_CI_POSTS) & ~np.isnan(rm)
+        lo    = np.where(valid, rm - rs, np.nan)
+        hi    = np.where(valid, rm + rs, np.nan)
+        return {
+            'daily_sentiment': pd.Series(np.asarray(self.u, dtype=float) / scale, index=idx),
+            'rolling_mean'   : pd.Series(rm, index=idx),
+            'ci_lower'       : pd.Series(lo, index=idx),
+            'ci_upper'       : pd.Series(hi, index=idx),
+            'trend'          : self.trend(),
+            'corr'           : self.co.corr(),
+        }
+
+    # ---------- persistence ----------
+    _FIELDS = ('window', 'days', 'u', 'cnt', 'rm_u', 'rs_u', 'max_cnt', 'pairs', 'updated_at')
+
+    def to_state(self) -> dict:
+        state = {k: getattr(self, k) for k in self._FIELDS}
+        state['win'] = [getattr(self.win, k) for k in Welford.__slots__]
+        state['co']  = [getattr(self.co, k) for k in CoMoments.__slots__]
+        return state
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'RollingAggregator':
+        obj = cls(state['window'])
+        for k in cls._FIELDS:
+            setattr(obj, k, state[k])
+        obj.win = Welford(*state['win'])
+        obj.co  = CoMoments(*state['co'])
+        return obj
+
+
+class RollingStore(MirroredStore):
+    """Per-(symbol, window) RollingAggregator under `rolling:<symbol>:<window>`."""
+
+    def __init__(self, client):
+        super().__init__(client, "rolling", ROLLING_TTL)
+
+    def new(self, symbol: str, window: int) -> RollingAggregator:
+        return RollingAggregator(window)
+
+    def load(self, state: dict) -> RollingAggregator:
+        return RollingAggregator.from_state(state)
+
+    @contextmanager
+    def open(self, symbol: str, window: int):
+        """As MirroredStore.open, and saved again on exit."""
+        with super().open(symbol, window) as agg:
+            yield agg
+            agg.updated_at = time.time()
+            self.save(agg, symbol, window)
+
+
+rolling_store = RollingStore(r)
@@ -0,0 +1,123 @@
+import os, re, time, hashlib, threading, redis
+from importlib.metadata import version
+from backend.cache import r, LRU
+from backend.metrics import CACHE
+
+# bump (or set SCORER_VERSION) whenever the scorer or lexicon changes
+SCORER_VERSION = os.getenv("SCORER_VERSION", f"vader-{version('nltk')}")
+SCORE_TTL      = int(os.getenv("SCORE_CACHE_TTL", 30 * 24 * 60 * 60))
+# seconds between pushes of this process's hit/miss counts to Redis
+STATS_FLUSH    = float(os.getenv("SCORE_STATS_FLUSH", 30))
+
+_WS = re.compile(r'\s+')
+
+
+def normalize(txt: str) -> str:
+    # VADER splits on whitespace, so collapsing it never changes a score
+    return _WS.sub(' ', str(txt)).strip()
+
+
+class ScoreCache:
+    """
+    Content-addressed polarity cache: sha1(scorer version + normalised
+    text) → compound score.  Process LRU in front of Redis; hit/miss
+    counters are kept locally and added to the Redis totals at most every
+    STATS_FLUSH seconds (and on `stats()`), never per lookup.
+    """
+
+    STATS_KEY = "scorecache:stats"
+
+    def __init__(self, client, ttl: int = SCORE_TTL, local_size: int = 50_000):
+        self.r        = client
+        self.ttl      = ttl
+        self.local    = LRU(local_size)
+        self.hits     = 0
+        self.misses   = 0
+        self._pending = [0, 0]                # not yet in Redis: hits, misses
+        self._flushed = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def key(self, txt: str) -> str:
+        digest = hashlib.sha1(f"{SCORER_VERSION}\0{normalize(txt)}".encode('utf-8')).hexdigest()
+        return f"score:{SCORER_VERSION}:{digest}"
+
+    def get_many(self, texts) -> dict:
+        """{text: score} for every text already scored somewhere."""
+        keys  = {t: self.key(t) for t in texts}
+        found = {}
+        for t, k in keys.items():
+            if (hit := self.local.get(k)) is not None:
+                found[t] = hit[1]
+
+        remote = [t for t in keys if t not in found]
+        if remote:
+            try:
+                for t, raw in zip(remote, self.r.mget([keys[t] for t in remote])):
+                    if raw is not None:
+                        found[t] = float(raw)
+                        self.local.set(keys[t], 0, found[t], float('inf'))
+            except redis.RedisError:
+                pass
+
+        self._count(len(found), len(keys) - len(found))
+        CACHE.inc(len(found), source='score', result='hit')
+        CACHE.inc(len(keys) - len(found), source='score', result='miss')
+        return found
+
+    def put_many(self, scores: dict) -> None:
+        if not scores:
+            return
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            for t, v in scores.items():
+                k = self.key(t)
+                self.local.set(k, 0, v, float('inf'))
+                pipe.setex(k, self.ttl, repr(float(v)))
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+    # ---------- hit-rate ----------
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits        += hits
+            self.misses      += misses
+            self._pending[0] += hits
+            self._pending[1] += misses
+            due = time.monotonic() - self._flushed >= STATS_FLUSH
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Add the counts gathered since the last flush to the Redis totals."""
+        with self._lock:
+            (hits, misses), self._pending = self._pending, [0, 0]
+            self._flushed = time.monotonic()
+        if not (hits or misses):
+            return
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            pipe.hincrby(self.STATS_KEY, 'hits', hits)
+            pipe.hincrby(self.STATS_KEY, 'misses', misses)
+            pipe.execute()
+        except redis.RedisError:
+            with self._lock:                  # try again next time
+                self._pending[0] += hits
+                self._pending[1] += misses
+
+    def stats(self) -> dict:
+        self.flush()
+        total = self.hits + self.misses
+        out   = {'version': SCORER_VERSION, 'hits': self.hits, 'misses': self.misses,
+                 'hit_rate': round(self.hits / total, 4) if total else 0.0}
+        try:
+            shared = {k.decode(): int(v) for k, v in self.r.hgetall(self.STATS_KEY).items()}
+            seen   = shared.get('hits', 0) + shared.get('misses', 0)
+            out['cluster'] = {**shared, 'hit_rate': round(shared.get('hits', 0) / seen, 4)
+                              if seen else 0.0}
+        except redis.RedisError:
+            pass
+        return out
+
+
+score_cache = ScoreCache(r)
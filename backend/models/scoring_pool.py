@@ -0,0 +1,76 @@
+import os, atexit, logging, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .registry import registry
+
+log = logging.getLogger(__name__)
+
+# 0 → always score inline (default).  Below the crossover, pickling texts
+# to another process costs more than VADER itself.
+PROCESSES    = int(os.getenv("SCORING_PROCESSES", 0))
+CROSSOVER    = int(os.getenv("SCORING_CROSSOVER", 2000))
+CHUNK        = int(os.getenv("SCORING_CHUNK", 500))
+START_METHOD = os.getenv("SCORING_START_METHOD",
+                         "forkserver" if "forkserver" in multiprocessing.get_all_start_methods()
+                         else "spawn")
+
+_pool = None
+_lock = threading.Lock()
+
+
+# ---------- worker side ----------
+def _init() -> None:
+    registry.preload('vader')                 # once per worker, not per task
+
+
+def _score(texts: list) -> list:
+    sia = registry.get('vader')
+    return [sia.polarity_scores(t)['compound'] for t in texts]
+
+
+# ---------- caller side ----------
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            ctx = multiprocessing.get_context(START_METHOD)
+            if START_METHOD == "forkserver":
+                # the fork server imports these once; workers fork from it warm
+                ctx.set_forkserver_preload(['backend.models.registry', 'nltk.sentiment.vader'])
+            _pool = ProcessPoolExecutor(max_workers=PROCESSES, mp_context=ctx, initializer=_init)
+        return _pool
+
+
+def enabled() -> bool:
+    # daemonic processes (Celery prefork children) may not start their own
+    return PROCESSES > 0 and not multiprocessing.current_process().daemon
+
+
+def sharded(n: int) -> bool:
+    """Would a batch of n texts go to the pool?"""
+    return enabled() and n >= CROSSOVER
+
+
+def compound(texts: list) -> list:
+    """VADER compound for every text; sharded across processes for big batches."""
+    if not sharded(len(texts)):
+        return _score(texts)
+
+    chunks = [texts[i:i + CHUNK] for i in range(0, len(texts), CHUNK)]
+    try:
+        return [s for part in _get_pool().map(_score, chunks) for s in part]
+    except BrokenProcessPool as exc:
+        log.warning("scoring pool died, scoring inline: %s", exc)
+        shutdown()
+        return _score(texts)
+
+
+def shutdown() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown)
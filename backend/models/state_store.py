@@ -0,0 +1,65 @@
+import threading, redis
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from backend.cache import dumps, loads
+
+
+class MirroredStore(ABC):
+    """
+    Per-key state objects kept in process and mirrored to Redis so API and
+    Celery share them.  Keys are `<prefix>:<part>:...`; a `<key>:at`
+    timestamp (the object's `stamp` attribute) tells a process when another
+    one has saved a newer copy.  Subclasses provide `new` and `load`.
+    """
+
+    stamp = 'updated_at'
+
+    def __init__(self, client, prefix: str, ttl: int):
+        self.r      = client
+        self.prefix = prefix
+        self.ttl    = ttl
+        self._objs  = {}
+        self._locks = {}
+        self._lock  = threading.Lock()
+
+    @abstractmethod
+    def new(self, *parts):
+        """A fresh object for these key parts."""
+
+    @abstractmethod
+    def load(self, state: dict):
+        """Rebuild an object from its `to_state()`."""
+
+    def key(self, *parts) -> str:
+        return ':'.join((self.prefix, *map(str, parts)))
+
+    @contextmanager
+    def open(self, *parts):
+        """Exclusive access to one object, synced from Redis first."""
+        key = self.key(*parts)
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            yield self._sync(key, parts)
+
+    def _sync(self, key: str, parts: tuple):
+        obj = self._objs.get(key) or self.new(*parts)
+        # another process may have saved since we last looked
+        try:
+            remote_at = float(self.r.get(f"{key}:at") or 0)
+            if remote_at > getattr(obj, self.stamp) and (raw := self.r.get(key)):
+                obj = self.load(loads(raw))
+        except redis.RedisError:
+            pass
+        self._objs[key] = obj
+        return obj
+
+    def save(self, obj, *parts) -> None:
+        key = self.key(*parts)
+        try:
+            pipe = self.r.pipeline()
+            pipe.setex(key, self.ttl, dumps(obj.to_state()))
+            pipe.setex(f"{key}:at", self.ttl, repr(getattr(obj, self.stamp)))
+            pipe.execute()
+        except redis.RedisError:
+            pass
@@ -1,59 +1,64 @@
 import os
-import time
-from functools import lru_cache
-import tweepy
+import logging
+import functools
 from dotenv import load_dotenv
 from datetime import datetime
 import pandas as pd
-from nltk.sentiment import SentimentIntensityAnalyzer
-import nltk
+from backend.cache import cached
+from backend.metrics import span
+from backend.ratelimit import limits
+from .enhanced_sentiment import EnhancedSentimentAnalyzer
 
-# ensure VADER lexicon is available
-nltk.download("vader_lexicon", quiet=True)
 load_dotenv()
+log = logging.getLogger(__name__)
 
 class TwitterSentimentAnalyzer:
     def __init__(self):
-        bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
-        self.client = tweepy.Client(bearer_token=bearer_token)
-        self.sia = SentimentIntensityAnalyzer()
+        self.enh = EnhancedSentimentAnalyzer()
+
+    @functools.cached_property
+    def client(self):
+        import tweepy
+        return tweepy.Client(bearer_token=os.getenv("TWITTER_BEARER_TOKEN"))
+
+    @cached(source='twitter')
+    def _search_tweets(self, symbol: str, limit: int) -> list:
+        """Recent tweets as plain (created_at, text) pairs so they cache."""
+        resp = limits.call(
+            "twitter", self.client.search_recent_tweets,
+            query=f"{symbol} stock -is:retweet lang:en",
+            max_results=limit,
+            tweet_fields=["created_at", "text"]
+        )
+        return [(t.created_at, t.text) for t in (resp.data or [])]
 
-    @lru_cache(maxsize=32)
     def analyze_sentiment(self, symbol: str, limit: int = 20) -> dict:
         """
-        Fetch recent tweets for <symbol>, compute sentiment via VADER,
-        with exponential backoff on rate limits, and return
-        {success, average_sentiment, post_count, daily_sentiment}.
+        Fetch recent tweets for <symbol>, compute sentiment via VADER and
+        return {success, average_sentiment, post_count, daily_sentiment, daily_counts}.
+        Rate limits, retries and back-off are handled by backend.ratelimit.
         """
-        for attempt in range(3):
-            try:
-                query = f"{symbol} stock -is:retweet lang:en"
-                resp = self.client.search_recent_tweets(
-                    query=query,
-                    max_results=limit,
-                    tweet_fields=["created_at", "text"]
-                )
-                tweets = resp.data or []
-                if not tweets:
-                    return {"success": False, "error": "No tweets found"}
-
-                times  = [t.created_at for t in tweets]
-                scores = [self.sia.polarity_scores(t.text)["compound"] for t in tweets]
-
-                df    = pd.DataFrame({"sentiment": scores}, index=pd.to_datetime(times))
-                daily = df["sentiment"].resample("D").mean()
+        try:
+            tweets = self._search_tweets(symbol, limit)
+            if not tweets:
+                return {"success": False, "error": "No tweets found"}
 
-                return {
-                    "success": True,
-                    "average_sentiment": float(df["sentiment"].mean()),
-                    "post_count": len(df),
-                    "daily_sentiment": daily
-                }
+            times  = [created for created, _ in tweets]
+            scores = self.enh.polarity_batch([text for _, text in tweets])
+
+            df    = pd.DataFrame({"sentiment": scores}, index=pd.to_datetime(times))
+            with span("resample"):
+                daily = df["sentiment"].resample("D").mean()
+                count = df["sentiment"].resample("D").count()
 
-            except tweepy.TooManyRequests:
-                time.sleep(2 ** attempt)
-            except Exception as e:
-                print(f"Twitter sentiment error: {e}")
-                return {"success": False, "error": str(e)}
+            return {
+                "success": True,
+                "average_sentiment": float(df["sentiment"].mean()),
+                "post_count": len(df),
+                "daily_sentiment": daily,
+                "daily_counts": count
+            }
 
-        return {"success": False, "error": "Twitter rate-limit exceeded"}
+        except Exception as e:
+            log.warning("Twitter sentiment error: %s", e)
+            return {"success": False, "error": str(e)}
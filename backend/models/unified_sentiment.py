@@ -1,19 +1,38 @@
+import os
+import functools
 import numpy as np
 import pandas as pd
 
+from .fanout             import fan_out
 from .reddit_sentiment   import RedditSentimentAnalyzer
 from .twitter_sentiment  import TwitterSentimentAnalyzer
 from .news_sentiment     import NewsSentimentAnalyzer
 from .stock_data         import StockDataFetcher
 from .fundamentals       import FundamentalsFetcher
+from .market_data        import provider as market_provider
+from .rolling_stats      import rolling_store
+from backend.metrics     import span
+
+# one‑time objects, built on first use (or by backend.startup.warmup)
+@functools.cache
+def analyzers() -> dict:
+    return {
+        'reddit' : RedditSentimentAnalyzer(),
+        'twitter': TwitterSentimentAnalyzer(),
+        'news'   : NewsSentimentAnalyzer(),
+    }
 
-# one‑time objects
-reddit_analyzer  = RedditSentimentAnalyzer()
-twitter_analyzer = TwitterSentimentAnalyzer()
-news_analyzer    = NewsSentimentAnalyzer()
 stock_fetcher    = StockDataFetcher()
 fund_fetcher     = FundamentalsFetcher()
 
+# per‑source budgets (seconds); a late source degrades to "unsuccessful"
+SOURCE_TIMEOUTS = {
+    'reddit'      : float(os.getenv('TIMEOUT_REDDIT',  15)),
+    'twitter'     : float(os.getenv('TIMEOUT_TWITTER', 10)),
+    'news'        : float(os.getenv('TIMEOUT_NEWS',    10)),
+    'market'      : float(os.getenv('TIMEOUT_YAHOO',   15)),
+}
+
 
 def get_unified_sentiment(symbol: str,
                           window: int = 5,
@@ -23,10 +42,21 @@ def get_unified_sentiment(symbol: str,
     window = rolling‑mean window (days)
     include_twitter = toggle Twitter scrape to conserve free API quota
     """
-    # ── 1) individual sources ──────────────────────────────────────────
-    rd = reddit_analyzer.analyze_sentiment(symbol)
-    tw = twitter_analyzer.analyze_sentiment(symbol) if include_twitter else {}
-    nw = news_analyzer.analyze_sentiment(symbol)
+    # ── 1) all sources concurrently ────────────────────────────────────
+    an   = analyzers()
+    jobs = {
+        'reddit'      : (an['reddit'].analyze_sentiment,    (symbol,), {}),
+        'news'        : (an['news'].analyze_sentiment,      (symbol,), {}),
+        # quote, fundamentals and OHLC share one Yahoo pass
+        'market'      : (market_provider.snapshot,          (symbol,), None),
+    }
+    if include_twitter:
+        jobs['twitter'] = (an['twitter'].analyze_sentiment, (symbol,), {})
+    res, timings = fan_out(jobs, SOURCE_TIMEOUTS)
+
+    rd = res['reddit']
+    tw = res.get('twitter', {})
+    nw = res['news']
 
     scores = {
         'reddit' : rd.get('average_sentiment', 0) if rd.get('success') else 0,
@@ -45,49 +75,51 @@ def get_unified_sentiment(symbol: str,
     if getattr(daily_counts.index, 'tz', None):
         daily_counts.index = daily_counts.index.tz_localize(None)
 
-    # volume‑weighted sentiment
-    if not daily_counts.empty and daily_counts.max() > 0:
-        weights  = daily_counts / daily_counts.max()
-        weighted = daily_sent * weights
-    else:
-        weighted = daily_sent.copy()
-
-    # rolling mean / std → confidence interval
-    rm = weighted.rolling(window, min_periods=3).mean()
-    rs = weighted.rolling(window, min_periods=3).std().fillna(0)
-
-    valid     = daily_counts.reindex(rm.index, fill_value=0) >= 5
-    ci_lower  = pd.Series(np.nan, index=rm.index)
-    ci_upper  = ci_lower.copy()
-    ci_lower.loc[valid] = rm[valid] - rs[valid]
-    ci_upper.loc[valid] = rm[valid] + rs[valid]
+    # per-source daily sentiment & counts (kept by the poller, backend/timeseries.py)
+    source_daily = {
+        name: pd.DataFrame({'sentiment': out['daily_sentiment'],
+                            'count'    : out.get('daily_counts')})
+        for name, out in (('reddit', rd), ('twitter', tw), ('news', nw))
+        if out.get('success') and 'daily_sentiment' in out
+    }
 
     # ── 3) market & fundamentals ───────────────────────────────────────
-    price_res  = stock_fetcher.get_stock_data(symbol)
-    history_df = stock_fetcher.history(symbol)
-    fnd        = fund_fetcher.get_fundamentals(symbol)
+    snap = res['market'] or {}
+    info = snap.get('info') or {}
+    try:
+        price_data = stock_fetcher.quote_from(info)['data']
+    except ValueError:
+        price_data = {}
+    history_df = snap.get('history')
+    if history_df is None:
+        history_df = pd.DataFrame(columns=['Close'], dtype=float)
+    fnd        = fund_fetcher.from_info(info)
 
-    trend = 'Neutral'
-    m = rm.dropna()
-    if not m.empty:
-        last = m.iloc[-1]
-        if   last > 0.20: trend = 'Bullish'
-        elif last < -0.20: trend = 'Bearish'
+    # volume‑weighted rolling stats, CI, trend and return correlation,
+    # updated in place from the last call's state (backend/models/rolling_stats.py)
+    with span("aggregate"), rolling_store.open(symbol, window) as agg:
+        agg.update(daily_sent, daily_counts)
+        agg.update_returns(history_df['Close'] if 'Close' in history_df
+                           else pd.Series(dtype=float))
+        stats = agg.result()
 
     return {
         'success'          : True,
         'average_sentiment': average_sentiment,
         'sources'          : scores,
-        'daily_sentiment'  : weighted,
+        'daily_sentiment'  : stats['daily_sentiment'],
         'daily_counts'     : daily_counts,
-        'rolling_mean'     : rm,
-        'ci_lower'         : ci_lower,
-        'ci_upper'         : ci_upper,
+        'source_daily'     : source_daily,
+        'rolling_mean'     : stats['rolling_mean'],
+        'ci_lower'         : stats['ci_lower'],
+        'ci_upper'         : stats['ci_upper'],
         'post_count'       : rd.get('post_count', 0),
-        'trend'            : trend,
+        'trend'            : stats['trend'],
+        'corr'             : stats['corr'],
         'stock_history'    : history_df,
-        'current_price'    : price_res['data'].get('current_price', 0),
-        'currency'         : price_res['data'].get('currency', 'USD'),
+        'current_price'    : price_data.get('current_price', 0),
+        'currency'         : price_data.get('currency', 'USD'),
         'pe'               : fnd['pe'],
-        'eps'              : fnd['eps']
+        'eps'              : fnd['eps'],
+        'timings'          : timings
     }
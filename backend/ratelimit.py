@@ -0,0 +1,241 @@
+import os, time, random, threading, redis
+
+from backend.cache import r, ProviderUnavailable
+from backend.metrics import UPSTREAM, UPSTREAM_SECONDS
+
+# tokens per minute, burst — override with QUOTA_<PROVIDER>="per_min,burst"
+QUOTAS = {
+    'reddit' : (60,   10),     # OAuth app limit is ~100/min
+    'twitter': (1,     3),     # free tier recent search
+    'newsapi': (0.07,  5),     # developer plan: 100/day
+    'yahoo'  : (60,   10),
+}
+QUOTAS = {p: tuple(float(x) for x in os.getenv(f"QUOTA_{p.upper()}", f"{q[0]},{q[1]}").split(','))
+          for p, q in QUOTAS.items()}
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", 5))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 60))
+BACKOFF_BASE     = float(os.getenv("BACKOFF_BASE", 0.5))
+BACKOFF_CAP      = float(os.getenv("BACKOFF_CAP", 30))
+
+
+class QuotaExhausted(ProviderUnavailable):
+    pass
+
+
+class CircuitOpen(ProviderUnavailable):
+    pass
+
+
+class BackingOff(ProviderUnavailable):
+    """A transient failure was just seen; the retry belongs to a later call."""
+
+
+class RateLimited(Exception):
+    """Upstream answered 429 (or its SDK's equivalent)."""
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    if isinstance(exc, RateLimited):
+        return True
+    resp = getattr(exc, 'response', None)
+    if getattr(resp, 'status_code', None) == 429 or getattr(resp, 'status', None) == 429:
+        return True
+    name = type(exc).__name__
+    return 'TooManyRequests' in name or 'RateLimit' in name
+
+
+def is_transient(exc: Exception) -> bool:
+    """429, 5xx or a network error: the provider, not the request, is at fault."""
+    if is_rate_limited(exc) or isinstance(exc, (OSError, TimeoutError)):
+        return True
+    resp   = getattr(exc, 'response', None)
+    status = getattr(resp, 'status_code', None) or getattr(resp, 'status', None)
+    if isinstance(status, int):
+        return status >= 500
+    name = type(exc).__name__
+    return any(k in name for k in ('Timeout', 'Connection', 'ServerError'))
+
+
+# --------------------------------------------------------------------
+# token bucket shared across processes (Redis), local if Redis is down
+# --------------------------------------------------------------------
+_TAKE = r.register_script("""
+local rate, cap, now, want = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local b      = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or cap
+local ts     = tonumber(b[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+local ok = 0
+if tokens >= want then
+    tokens = tokens - want
+    ok = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(cap / rate) + 60)
+return ok
+""")
+
+
+class TokenBucket:
+    def __init__(self, client, provider: str, per_min: float, burst: float):
+        self.r        = client
+        self.key      = f"quota:{provider}"
+        self.rate     = per_min / 60.0
+        self.cap      = burst
+        self._tokens  = burst
+        self._ts      = time.time()
+        self._lock    = threading.Lock()
+
+    def take(self, n: float = 1) -> bool:
+        now = time.time()
+        try:
+            return bool(_TAKE(keys=[self.key], args=[self.rate, self.cap, now, n], client=self.r))
+        except redis.RedisError:
+            with self._lock:
+                self._tokens = min(self.cap, self._tokens + (now - self._ts) * self.rate)
+                self._ts     = now
+                if self._tokens >= n:
+                    self._tokens -= n
+                    return True
+                return False
+
+    def peek(self) -> float:
+        """Tokens available right now, without taking any."""
+        now = time.time()
+        try:
+            tokens, ts = self.r.hmget(self.key, 'tokens', 'ts')
+        except redis.RedisError:
+            tokens = None
+        if tokens is None:                    # Redis down or bucket untouched there
+            with self._lock:
+                tokens, ts = self._tokens, self._ts
+        return min(self.cap, float(tokens) + max(0.0, now - float(ts)) * self.rate)
+
+
+class CircuitBreaker:
+    """closed → (N consecutive failures) → open → (cooldown) → half-open."""
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.failures  = failures
+        self.cooldown  = cooldown
+        self._count    = 0
+        self._opened   = 0.0
+        self._trial    = False
+        self._lock     = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._count < self.failures:
+            return 'closed'
+        return 'half-open' if time.time() - self._opened >= self.cooldown else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial:
+                self._trial = True               # exactly one probe
+                return True
+            return False
+
+    def release(self) -> None:
+        """Hand back a half-open probe that never reached the provider."""
+        with self._lock:
+            self._trial = False
+
+    def success(self) -> None:
+        with self._lock:
+            self._count, self._trial = 0, False
+
+    def failure(self) -> None:
+        with self._lock:
+            self._count += 1
+            self._trial  = False
+            if self._count >= self.failures:
+                self._opened = time.time()
+
+
+class Backoff:
+    """
+    Full-jitter exponential backoff that never sleeps: after a transient
+    failure the provider is skipped until the drawn delay has passed, and
+    the next call after that is the retry.
+    """
+
+    def __init__(self, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP):
+        self.base    = base
+        self.cap     = cap
+        self._strike = 0
+        self._until  = 0.0
+        self._lock   = threading.Lock()
+
+    def ready(self) -> bool:
+        return time.time() >= self._until
+
+    def failure(self, limited: bool) -> None:
+        with self._lock:
+            self._strike += 1
+            delay = random.uniform(0, min(self.cap, self.base * 2 ** (self._strike - 1)))
+            self._until = time.time() + delay + (self.base if limited else 0)
+
+    def success(self) -> None:
+        with self._lock:
+            self._strike, self._until = 0, 0.0
+
+
+class Limits:
+    """
+    Per-provider quota + circuit breaker + jittered backoff.  Never waits:
+    an empty bucket, an open breaker or a pending backoff raises a
+    ProviderUnavailable, which `cached` answers from whatever it holds.
+    Only transient failures (429, 5xx, network) count against the breaker
+    and start a backoff; a bad symbol or a 4xx is the caller's problem.
+    """
+
+    def __init__(self, client):
+        self.buckets  = {p: TokenBucket(client, p, *q) for p, q in QUOTAS.items()}
+        self.breakers = {p: CircuitBreaker() for p in QUOTAS}
+        self.backoffs = {p: Backoff() for p in QUOTAS}
+
+    def call(self, provider: str, fn, *args, **kwargs):
+        bucket, breaker, backoff = (self.buckets[provider], self.breakers[provider],
+                                    self.backoffs[provider])
+        if not backoff.ready():
+            UPSTREAM.inc(provider=provider, outcome='backoff')
+            raise BackingOff(f"{provider} backing off")
+        if not breaker.allow():
+            UPSTREAM.inc(provider=provider, outcome='circuit_open')
+            raise CircuitOpen(f"{provider} circuit open")
+        if not bucket.take():
+            breaker.release()
+            UPSTREAM.inc(provider=provider, outcome='quota')
+            raise QuotaExhausted(f"{provider} quota exhausted")
+
+        t0 = time.perf_counter()
+        try:
+            value = fn(*args, **kwargs)
+        except Exception as exc:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - t0, provider=provider)
+            if not is_transient(exc):
+                breaker.success()                # the provider answered fine
+                UPSTREAM.inc(provider=provider, outcome='error')
+                raise
+            limited = is_rate_limited(exc)
+            UPSTREAM.inc(provider=provider, outcome='rate_limited' if limited else 'unavailable')
+            breaker.failure()
+            backoff.failure(limited)
+            # hand the retry to the cache (stale / grace copy) and a later call
+            raise BackingOff(f"{provider}: {exc}") from exc
+        UPSTREAM_SECONDS.observe(time.perf_counter() - t0, provider=provider)
+        UPSTREAM.inc(provider=provider, outcome='ok')
+        breaker.success()
+        backoff.success()
+        return value
+
+    def status(self) -> dict:
+        return {p: self.breakers[p].state for p in QUOTAS}
+
+
+limits = Limits(r)
@@ -0,0 +1,296 @@
+# backend/scheduler.py
+"""
+Adaptive polling for streamed symbols.
+
+Every API process exports its live WebSocket counts (main.SUBS) to Redis.
+One Celery beat tick (`tasks.schedule_tick`), made exclusive with a Redis
+lock, reads them and decides which symbols are due.  It then sends the
+due symbols to a handful of `poll_watchlist` tasks.  The task count
+depends on the number of due symbols, not on users × symbols.
+
+    watched, market open     POLL_HOT, shortened by sentiment volatility
+    watched, market closed   POLL_CLOSED
+    unwatched                POLL_IDLE (× IDLE_CLOSED_FACTOR when closed),
+                             forgotten IDLE_TTL after the last watcher left
+
+Each provider has a scheduler budget of SCHED_QUOTA_SHARE of its quota
+(backend/ratelimit.py).  The rest is left for /analyze.  A poll is
+charged only for the sources whose cache would miss.  When reddit or
+yahoo is out of budget the symbol waits for the next tick.  Twitter is
+only requested for watched symbols while it has budget.
+"""
+import os, math, time, socket, asyncio, logging, datetime, functools
+from zoneinfo import ZoneInfo
+
+from backend.cache import TTLS
+from backend.ratelimit import QUOTAS, TokenBucket, limits
+
+log = logging.getLogger(__name__)
+
+TICK            = float(os.getenv("SCHED_TICK", 5))
+EXPORT_INTERVAL = float(os.getenv("SUBS_EXPORT_INTERVAL", 5))
+POLL_HOT        = float(os.getenv("POLL_HOT", 30))
+POLL_MIN        = float(os.getenv("POLL_MIN", 10))
+POLL_CLOSED     = float(os.getenv("POLL_CLOSED", 300))
+POLL_IDLE       = float(os.getenv("POLL_IDLE", 900))
+IDLE_CLOSED_FACTOR = float(os.getenv("IDLE_CLOSED_FACTOR", 4))
+IDLE_TTL        = float(os.getenv("SCHED_IDLE_TTL", 3600))
+VOL_SCALE       = float(os.getenv("SCHED_VOL_SCALE", 0.05))     # std that halves POLL_HOT
+VOL_SAMPLES     = int(os.getenv("SCHED_VOL_SAMPLES", 12))
+QUOTA_SHARE     = float(os.getenv("SCHED_QUOTA_SHARE", 0.8))
+BATCH           = int(os.getenv("SCHED_BATCH", 25))
+MAX_QUEUE       = int(os.getenv("SCHED_MAX_QUEUE", 50))         # broker backlog → skip tick
+WINDOW          = int(os.getenv("SCHED_WINDOW", 5))
+CELERY_QUEUE    = os.getenv("CELERY_QUEUE", "celery")
+
+MARKET_TZ    = ZoneInfo(os.getenv("MARKET_TZ", "America/New_York"))
+MARKET_HOURS = tuple(datetime.time.fromisoformat(t) for t in
+                     os.getenv("MARKET_HOURS", "09:30-16:00").split('-'))
+
+# provider → cache source whose TTL decides whether a poll reaches it
+SOURCES  = {'reddit': 'reddit', 'twitter': 'twitter', 'newsapi': 'news', 'yahoo': 'quote'}
+REQUIRED = ('reddit', 'yahoo')
+
+PROCS = "subs:procs"              # set of per-process count hashes
+LOCK  = "sched:lock"
+DUE   = "sched:due"               # zset symbol → next poll time
+SEEN  = "sched:seen"              # zset symbol → last time it had a watcher
+
+
+# ---------- API side: export SUBS ----------
+class SubsExporter:
+    """
+    Mirrors {symbol: sockets} of this process into the hash
+    `subs:<host>:<pid>` every EXPORT_INTERVAL.  Call `nudge()` to export
+    right away, e.g. when a symbol gets its first watcher.  The hash expires
+    if the process dies.
+    """
+
+    def __init__(self, redis, subs, interval: float = EXPORT_INTERVAL):
+        self.r        = redis
+        self.subs     = subs
+        self.interval = interval
+        self.key      = f"subs:{socket.gethostname()}:{os.getpid()}"
+        self._changed = asyncio.Event()
+        self._task    = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def nudge(self) -> None:
+        self._changed.set()
+
+    async def export(self) -> None:
+        counts = {sym: len(socks) for sym, socks in self.subs.items() if socks}
+        pipe = self.r.pipeline()
+        pipe.delete(self.key)
+        if counts:
+            pipe.hset(self.key, mapping=counts)
+        pipe.expire(self.key, int(self.interval * 3) + 1)
+        pipe.sadd(PROCS, self.key)
+        await pipe.execute()
+
+    async def _run(self) -> None:
+        while True:
+            self._changed.clear()
+            try:
+                await self.export()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.warning("subscriber export failed: %s", exc)
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        try:
+            await self.r.delete(self.key)
+            await self.r.srem(PROCS, self.key)
+        except Exception:
+            pass
+
+
+# ---------- worker side ----------
+def watchers(client) -> dict:
+    """Live subscribers per symbol, summed over every API process."""
+    keys = [k.decode() if isinstance(k, bytes) else k for k in client.smembers(PROCS)]
+    pipe = client.pipeline(transaction=False)
+    for k in keys:
+        pipe.hgetall(k)
+    total = {}
+    for key, counts in zip(keys, pipe.execute()):
+        if not counts:                        # expired: its process is gone
+            client.srem(PROCS, key)
+            continue
+        for sym, n in counts.items():
+            sym = sym.decode() if isinstance(sym, bytes) else sym
+            total[sym] = total.get(sym, 0) + int(n)
+    return total
+
+
+def market_open(now: float | None = None) -> bool:
+    """Regular session only (weekdays, MARKET_HOURS); holidays count as open."""
+    t = datetime.datetime.fromtimestamp(now or time.time(), MARKET_TZ)
+    return t.weekday() < 5 and MARKET_HOURS[0] <= t.time() < MARKET_HOURS[1]
+
+
+def observe(client, symbol: str, snap: dict) -> None:
+    """Remember the latest average sentiment; its spread drives poll frequency."""
+    avg = snap.get('average_sentiment')
+    if avg is None or avg != avg:
+        return
+    key  = f"sched:hist:{symbol}"
+    pipe = client.pipeline()
+    pipe.lpush(key, float(avg))
+    pipe.ltrim(key, 0, VOL_SAMPLES - 1)
+    pipe.expire(key, int(IDLE_TTL))
+    pipe.execute()
+
+
+def volatility(samples: list) -> float:
+    x = [float(s) for s in samples]
+    if len(x) < 2:
+        return 0.0
+    mean = sum(x) / len(x)
+    return math.sqrt(sum((v - mean) ** 2 for v in x) / (len(x) - 1))
+
+
+def interval(n_watchers: int, is_open: bool, vol: float) -> float:
+    """Seconds until the next poll."""
+    if n_watchers and is_open:
+        return max(POLL_MIN, POLL_HOT / (1 + vol / VOL_SCALE))
+    if n_watchers:
+        return POLL_CLOSED
+    return POLL_IDLE * (1 if is_open else IDLE_CLOSED_FACTOR)
+
+
+def priority(n_watchers: int, vol: float) -> float:
+    return math.log1p(n_watchers) * (1 + vol / VOL_SCALE)
+
+
+class Budget:
+    """
+    The scheduler's share of each provider's quota.  A poll is affordable
+    only if both the scheduler's own bucket and the real shared bucket
+    (which /analyze also drains) hold enough tokens.
+    """
+
+    def __init__(self, client, share: float = QUOTA_SHARE):
+        self.buckets = {p: TokenBucket(client, f"sched:{p}", q[0] * share, max(1.0, q[1] * share))
+                        for p, q in QUOTAS.items()}
+        self.left    = {}
+
+    def open(self) -> None:
+        self.left = {p: min(b.peek(), limits.buckets[p].peek()) for p, b in self.buckets.items()}
+
+    def afford(self, cost: dict) -> bool:
+        return all(self.left[p] >= n for p, n in cost.items())
+
+    def spend(self, cost: dict) -> None:
+        for p, n in cost.items():
+            self.left[p] -= n
+
+    def commit(self, spent: dict) -> None:
+        for p, n in spent.items():
+            if n:
+                self.buckets[p].take(n)
+
+
+@functools.cache
+def _budget(client) -> Budget:
+    # one per process: the buckets' local fallback must outlive a tick
+    return Budget(client)
+
+
+def tick(client, dispatch, now: float | None = None) -> dict:
+    """
+    One scheduling pass.  `dispatch(symbols, window, include_twitter)`
+    queues the polls.  Returns a summary for logs and /stats/schedule.
+    """
+    now = now or time.time()
+    if not client.set(LOCK, now, nx=True, px=max(1000, int(TICK * 800))):
+        return {'skipped': 'locked'}
+    try:
+        if client.llen(CELERY_QUEUE) > MAX_QUEUE:
+            return {'skipped': 'backlog'}
+    except Exception:
+        pass
+
+    counts  = watchers(client)
+    is_open = market_open(now)
+    pipe = client.pipeline()
+    if counts:
+        pipe.zadd(SEEN, {s: now for s in counts})
+        pipe.zadd(DUE, {s: now for s in counts}, nx=True)     # new watchers: poll now
+    pipe.zrangebyscore(SEEN, '-inf', now - IDLE_TTL)
+    gone = [s.decode() for s in pipe.execute()[-1]]
+    if gone:
+        pipe = client.pipeline()
+        pipe.zrem(SEEN, *gone)
+        pipe.zrem(DUE, *gone)
+        pipe.delete(*(f"sched:hist:{s}" for s in gone), *(f"sched:sym:{s}" for s in gone))
+        pipe.execute()
+
+    due = [s.decode() for s in client.zrangebyscore(DUE, '-inf', now)]
+    if not due:
+        return {'open': is_open, 'watched': len(counts), 'due': 0, 'dispatched': 0}
+
+    pipe = client.pipeline(transaction=False)
+    for s in due:
+        pipe.lrange(f"sched:hist:{s}", 0, -1)
+        pipe.hgetall(f"sched:sym:{s}")
+    res   = pipe.execute()
+    vols  = {s: volatility(res[2 * i]) for i, s in enumerate(due)}
+    last  = {s: {k.decode(): float(v) for k, v in res[2 * i + 1].items()} for i, s in enumerate(due)}
+    ranked = sorted(due, key=lambda s: priority(counts.get(s, 0), vols[s]), reverse=True)
+
+    budget = _budget(client)
+    budget.open()
+    spent  = dict.fromkeys(QUOTAS, 0)
+    groups = {True: [], False: []}
+    pipe   = client.pipeline()
+    for sym in ranked:
+        cost = {p: 1 for p, src in SOURCES.items() if now - last[sym].get(p, 0) >= TTLS[src]}
+        if not budget.afford({p: n for p, n in cost.items() if p in REQUIRED}):
+            continue                                          # still due next tick
+        twitter = bool(counts.get(sym)) and budget.afford({'twitter': cost.get('twitter', 0)})
+        if not twitter:
+            cost.pop('twitter', None)
+        if not budget.afford({'newsapi': cost.get('newsapi', 0)}):
+            cost.pop('newsapi', None)                         # served stale from cache
+        budget.spend(cost)
+        for p, n in cost.items():
+            spent[p] += n
+        groups[twitter].append(sym)
+        if cost:
+            pipe.hset(f"sched:sym:{sym}", mapping={p: now for p in cost})
+            pipe.expire(f"sched:sym:{sym}", int(IDLE_TTL))
+        pipe.zadd(DUE, {sym: now + interval(counts.get(sym, 0), is_open, vols[sym])})
+    pipe.execute()
+    budget.commit(spent)
+
+    for twitter, syms in groups.items():
+        for i in range(0, len(syms), BATCH):
+            dispatch(syms[i:i + BATCH], WINDOW, twitter)
+    dispatched = len(groups[True]) + len(groups[False])
+    return {'open': is_open, 'watched': len(counts), 'due': len(due),
+            'dispatched': dispatched, 'deferred': len(due) - dispatched, 'spent': spent}
+
+
+def status(client, now: float | None = None) -> dict:
+    """What the scheduler is tracking and when each symbol is next polled."""
+    now    = now or time.time()
+    counts = watchers(client)
+    due    = client.zrange(DUE, 0, -1, withscores=True)
+    return {
+        'market_open': market_open(now),
+        'symbols': {s.decode(): {'watchers': counts.get(s.decode(), 0),
+                                 'next_poll_in': round(max(0.0, t - now), 1)} for s, t in due},
+    }
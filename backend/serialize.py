@@ -0,0 +1,144 @@
+# backend/serialize.py
+"""
+Response encodings for /analyze.
+
+  application/json                         legacy {timestamp: value} dicts
+  application/vnd.sentiment.columnar+json  one shared date index + value arrays
+  application/vnd.apache.arrow.stream      Arrow IPC table (needs pyarrow)
+
+All JSON goes through orjson (NaN → null).  Bodies above MIN_COMPRESS bytes
+are brotli- or gzip-compressed when the client accepts it.
+"""
+import gzip, os
+import numpy as np
+import pandas as pd
+import orjson
+from backend.metrics import span
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+LEGACY   = "application/json"
+COLUMNAR = "application/vnd.sentiment.columnar+json"
+ARROW    = "application/vnd.apache.arrow.stream"
+
+MIN_COMPRESS = int(os.getenv("MIN_COMPRESS", 1024))
+
+_OPTS  = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+_TS    = '%Y-%m-%d %H:%M:%S'
+SERIES = ('daily_sentiment', 'rolling_mean', 'ci_lower', 'ci_upper')
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=str, option=_OPTS)
+
+
+# --------------------------------------------------------------------
+# payload shapes
+# --------------------------------------------------------------------
+def _summary(unified: dict) -> dict:
+    return {
+        "fundamentals": {"pe": unified["pe"], "eps": unified["eps"]},
+        "sentiment": {
+            "average_sentiment": unified["average_sentiment"],
+            "trend"            : unified["trend"],
+            "corr"             : unified["corr"],
+            "sources"          : unified["sources"],
+        },
+        "current_price": unified["current_price"],
+        "currency"     : unified["currency"],
+        "timings"      : unified["timings"],
+    }
+
+
+def num(v, digits: int | None = None):
+    """Scalar → float, None for NaN / missing."""
+    if v is None or v != v:
+        return None
+    return float(v) if digits is None else round(float(v), digits)
+
+
+def points(s: pd.Series, fmt: str = _TS, digits: int | None = None) -> dict:
+    """Series → {timestamp string: value}, NaN as None."""
+    keys = s.index.strftime(fmt) if isinstance(s.index, pd.DatetimeIndex) else s.index.astype(str)
+    vals = s.to_numpy(dtype=float, na_value=np.nan)
+    if digits is not None:
+        vals = vals.round(digits)
+    return dict(zip(keys, [None if v != v else v for v in vals.tolist()]))
+
+
+def legacy(unified: dict) -> dict:
+    out = _summary(unified)
+    out["sentiment"].update({k: points(unified[k]) for k in SERIES})
+    out["sentiment"]["stock_history"] = points(_close(unified))
+    return out
+
+
+def _close(unified: dict) -> pd.Series:
+    hist = unified["stock_history"]
+    return hist["Close"] if "Close" in hist else pd.Series(dtype=float)
+
+
+def frame(unified: dict) -> pd.DataFrame:
+    """All plotted series on one shared, sorted date index."""
+    cols = {k: unified[k] for k in SERIES}
+    cols["close"] = _close(unified)
+    return pd.concat(cols, axis=1).sort_index()
+
+
+def columnar(unified: dict) -> dict:
+    df  = frame(unified)
+    out = _summary(unified)
+    out["series"] = {"index": df.index.strftime('%Y-%m-%d').tolist(),
+                     **{c: df[c].to_numpy(dtype=float) for c in df.columns}}
+    return out
+
+
+def arrow(unified: dict) -> bytes:
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+    df    = frame(unified)
+    table = pa.Table.from_pandas(df.rename_axis("date"), preserve_index=True)
+    table = table.replace_schema_metadata({b"summary": dumps(_summary(unified))})
+    sink  = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# --------------------------------------------------------------------
+# negotiation
+# --------------------------------------------------------------------
+def negotiate(accept: str, fmt: str | None = None) -> str:
+    fmt = (fmt or "").lower()
+    if fmt == "arrow" or ARROW in accept:
+        return ARROW if pa is not None else COLUMNAR
+    if fmt == "columnar" or COLUMNAR in accept:
+        return COLUMNAR
+    return LEGACY
+
+
+def encode(unified: dict, media_type: str, accept_encoding: str = "") -> tuple[bytes, dict]:
+    """Body bytes + response headers for `media_type`, compressed if worthwhile."""
+    with span("serialize"):
+        if media_type == ARROW:
+            body = arrow(unified)
+        elif media_type == COLUMNAR:
+            body = dumps(columnar(unified))
+        else:
+            body = dumps(legacy(unified))
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= MIN_COMPRESS:
+        if brotli is not None and "br" in accept_encoding:
+            body, headers["Content-Encoding"] = brotli.compress(body, quality=4), "br"
+        elif "gzip" in accept_encoding:
+            body, headers["Content-Encoding"] = gzip.compress(body, compresslevel=5), "gzip"
+    return body, headers
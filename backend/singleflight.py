@@ -0,0 +1,135 @@
+import os, json, uuid, functools, threading, redis
+
+from backend.cache import r, dumps, loads
+
+# compare-and-delete so a slow leader never drops someone else's lease
+_RELEASE = r.register_script("""
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+""")
+
+
+class _Call:
+    def __init__(self):
+        self.done  = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one computation.
+    In-process callers wait on the leader thread.  Across processes the
+    leader holds a Redis lease (`sf:lock:<key>` = its token); a follower
+    registers under that token and blocks in one BLPOP for at most `wait`
+    seconds, then computes on its own (through the same raw-data caches)
+    rather than holding its pool thread for the whole lease.  The leader
+    hands its result only to the followers registered with it, and the
+    list expires after `wait`, so nothing is served after the flight ends:
+    caching stays `cached()`'s job.
+    """
+
+    def __init__(self, client, lease: float = 60, wait: float = 5):
+        self.r      = client
+        self.lease  = lease
+        self.wait   = wait
+        self._calls = {}
+        self._lock  = threading.Lock()
+
+    def do(self, key: str, fn, *args, **kwargs):
+        with self._lock:
+            call   = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = self._across_processes(key, fn, args, kwargs)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    # ---------- redis lease ----------
+    def _across_processes(self, key, fn, args, kwargs):
+        lock_key = f"sf:lock:{key}"
+        token    = uuid.uuid4().hex
+        leader   = None
+        try:
+            while leader is None and not self.r.set(lock_key, token, nx=True,
+                                                    px=int(self.lease * 1000)):
+                leader = self.r.get(lock_key)           # None: released meanwhile, retry
+        except redis.RedisError:
+            return fn(*args, **kwargs)                  # no redis → just compute
+        if leader is not None:                          # another process leads
+            return self._follow(key, leader.decode(), fn, args, kwargs)
+
+        payload = b""                                   # "compute it yourself"
+        try:
+            value = fn(*args, **kwargs)
+            try:
+                payload = dumps(value)
+            except TypeError:
+                pass
+            return value
+        finally:
+            self._hand_over(key, token, payload)
+            try:
+                _RELEASE(keys=[lock_key], args=[token], client=self.r)
+            except redis.RedisError:
+                pass
+
+    def _follow(self, key, leader, fn, args, kwargs):
+        waiters, res_key = f"sf:wait:{key}:{leader}", f"sf:res:{key}:{leader}"
+        try:
+            pipe = self.r.pipeline()
+            pipe.incr(waiters)
+            pipe.pexpire(waiters, int(self.lease * 1000))
+            pipe.execute()
+            got = self.r.blpop([res_key], timeout=self.wait)
+        except redis.RedisError:
+            got = None
+        if got and got[1]:
+            return loads(got[1])
+        return fn(*args, **kwargs)                      # slow or failed leader
+
+    def _hand_over(self, key, token, payload: bytes) -> None:
+        waiters, res_key = f"sf:wait:{key}:{token}", f"sf:res:{key}:{token}"
+        try:
+            pipe = self.r.pipeline()
+            pipe.get(waiters)
+            pipe.delete(waiters)
+            n = int(pipe.execute()[0] or 0)
+            if n:
+                pipe.rpush(res_key, *[payload] * n)
+                pipe.pexpire(res_key, int(self.wait * 1000))
+                pipe.execute()
+        except redis.RedisError:
+            pass
+
+
+flight = SingleFlight(r, lease=float(os.getenv("SINGLEFLIGHT_LEASE", 60)),
+                      wait=float(os.getenv("SINGLEFLIGHT_WAIT", 5)))
+
+
+def single_flight(prefix: str):
+    """Decorator: concurrent calls with equal arguments share one result."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            key = f"{prefix}:{json.dumps([args, kwargs], sort_keys=True)}"
+            return flight.do(key, fn, *args, **kwargs)
+        return inner
+    return wrap
@@ -0,0 +1,92 @@
+# backend/startup.py
+"""
+Startup bookkeeping and the one-shot warmup.
+
+Heavy dependencies (nltk, praw, tweepy, yfinance) and the analyzers are
+only loaded on first use.  `warmup()` does that ahead of time, once per
+process: API startup runs it in the background, Celery at worker init.
+Every step's wall time lands in `timings` (reported at /stats/startup).
+"""
+import os, sys, time, logging, importlib, threading
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+PROCESS_START = time.perf_counter()
+NLTK_RESOURCES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'stopwords'    : 'corpora/stopwords',
+    'punkt'        : 'tokenizers/punkt',
+}
+# "0" → only check the local nltk_data cache, never hit the network
+NLTK_DOWNLOAD = os.getenv("NLTK_DOWNLOAD", "1") == "1"
+
+timings = {}                                  # step → ms
+_warm   = threading.Event()
+_lock   = threading.Lock()
+_nltk   = {}                                  # resource → available
+
+
+@contextmanager
+def timed(step: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[step] = round((time.perf_counter() - t0) * 1000, 1)
+
+
+def import_timed(module: str):
+    if module in sys.modules:
+        return sys.modules[module]
+    with timed(f"import {module}"):
+        return importlib.import_module(module)
+
+
+def ensure_nltk() -> dict:
+    """Check NLTK resources once per process; download only what's missing."""
+    with _lock:
+        if _nltk:
+            return _nltk
+        nltk = import_timed('nltk')
+        with timed('nltk resources'):
+            for name, path in NLTK_RESOURCES.items():
+                try:
+                    nltk.data.find(path)
+                    _nltk[name] = True
+                except LookupError:
+                    ok = NLTK_DOWNLOAD and nltk.download(name, quiet=True)
+                    _nltk[name] = bool(ok)
+                    if not ok:
+                        log.warning("nltk resource %s unavailable", name)
+        return _nltk
+
+
+def warmup() -> dict:
+    """Import heavy deps and build the analyzers once; safe to call repeatedly."""
+    if _warm.is_set():
+        return report()
+    with timed('warmup'):
+        ensure_nltk()
+        for module in ('yfinance', 'praw', 'tweepy'):
+            try:
+                import_timed(module)
+            except ImportError as exc:
+                log.warning("warmup: %s", exc)
+        from backend.models import unified_sentiment
+        from backend.models.registry import registry
+        with timed('models'):
+            registry.preload()
+        with timed('analyzers'):
+            unified_sentiment.analyzers()
+    _warm.set()
+    return report()
+
+
+def report() -> dict:
+    return {
+        'warm'       : _warm.is_set(),
+        'uptime_s'   : round(time.perf_counter() - PROCESS_START, 1),
+        'nltk'       : dict(_nltk),
+        'timings_ms' : dict(timings),
+    }
@@ -0,0 +1,133 @@
+# backend/stream_codec.py
+"""
+Compact WebSocket frames for `stream:<symbol>`.
+
+    {"type": "full",  "seq": 41, "symbol": "AAPL", "data": {...}}
+    {"type": "delta", "seq": 42, "base": 41, "symbol": "AAPL",
+     "data": {"set": {...scalars}, "points": {series: {date: v}},
+              "drop": {series: [date, ...]}}}
+
+A client applies a delta only if `base` equals the last seq it holds;
+otherwise (or after a dropped frame) it sends "resync" and receives the
+latest full frame again.  Series are {ISO date: value | null}.
+"""
+import json, os, datetime
+import redis
+import pandas as pd
+
+from backend.serialize import num, points
+
+try:
+    import orjson
+except ImportError:                       # stdlib fallback, same wire format
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# "json" (text frames) or "msgpack" (binary frames)
+FORMAT = os.getenv("STREAM_FORMAT", "json")
+if FORMAT == "msgpack" and msgpack is None:
+    FORMAT = "json"
+
+# how long the last full frame outlives the symbol's last publish
+LAST_TTL = int(os.getenv("STREAM_LAST_TTL", 86400))
+DIGITS   = 6
+
+SCALARS = ('average_sentiment', 'trend', 'corr', 'sources', 'post_count',
+           'current_price', 'currency', 'pe', 'eps')
+SERIES  = ('daily_sentiment', 'rolling_mean', 'ci_lower', 'ci_upper', 'close')
+
+
+def _scalar(v):
+    if isinstance(v, dict):
+        return {k: _scalar(x) for k, x in v.items()}
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return num(v, DIGITS)
+    if hasattr(v, 'item'):                # numpy scalar
+        return _scalar(v.item())
+    return v
+
+
+def compact(snap: dict) -> dict:
+    """get_unified_sentiment output → plain, diffable dict."""
+    hist  = snap.get('stock_history')
+    close = hist['Close'] if hist is not None and 'Close' in hist else pd.Series(dtype=float)
+    out   = {k: _scalar(snap.get(k)) for k in SCALARS}
+    out.update({k: points(snap[k], '%Y-%m-%d', DIGITS) for k in SERIES[:-1] if k in snap})
+    out['close'] = points(close, '%Y-%m-%d', DIGITS)
+    return out
+
+
+def diff(prev: dict, cur: dict) -> dict:
+    """Only what changed between two compact snapshots."""
+    out = {'set': {}, 'points': {}, 'drop': {}}
+    for k in SCALARS:
+        if prev.get(k) != cur.get(k):
+            out['set'][k] = cur.get(k)
+    for k in SERIES:
+        old, new = prev.get(k, {}), cur.get(k, {})
+        changed  = {d: v for d, v in new.items() if d not in old or old[d] != v}
+        gone     = [d for d in old if d not in new]
+        if changed:
+            out['points'][k] = changed
+        if gone:
+            out['drop'][k] = gone
+    return {k: v for k, v in out.items() if v}
+
+
+def encode(frame: dict) -> bytes:
+    if FORMAT == "msgpack":
+        return msgpack.packb(frame, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(frame)
+    return json.dumps(frame, separators=(',', ':')).encode('utf-8')
+
+
+def decode(raw: bytes) -> dict:
+    if FORMAT == "msgpack":
+        return msgpack.unpackb(raw, raw=False)
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+# ---------- publisher side (sync redis, used by Celery) ----------
+def publish(r, symbol: str, snap: dict) -> dict | None:
+    """
+    Publish `snap` as a full frame (first time) or a delta against the
+    last published state.  Returns the frame sent, None if nothing changed.
+    Pollers may publish one symbol concurrently: the read of the last frame
+    and the write of the next are one WATCH/MULTI transaction, retried if
+    another publisher got in between, so every delta's `base` is the seq
+    it was computed against.
+    """
+    cur      = compact(snap)
+    last_key = f"stream:last:{symbol}"
+    seq_key  = f"stream:seq:{symbol}"
+    with r.pipeline() as pipe:
+        while True:
+            try:
+                pipe.watch(last_key, seq_key)
+                raw  = pipe.get(last_key)
+                prev = decode(raw) if raw else None
+                if prev is not None:
+                    delta = diff(prev['data'], cur)
+                    if not delta:
+                        pipe.unwatch()
+                        return None
+
+                # seq outlives stream:last so a new full frame never reuses one
+                seq   = int(pipe.get(seq_key) or 0) + 1
+                ts    = datetime.datetime.utcnow().isoformat()
+                full  = {'type': 'full', 'seq': seq, 'symbol': symbol, 'ts': ts, 'data': cur}
+                frame = full if prev is None else {'type': 'delta', 'seq': seq, 'base': prev['seq'],
+                                                   'symbol': symbol, 'ts': ts, 'data': delta}
+                pipe.multi()
+                pipe.set(last_key, encode(full), ex=LAST_TTL)
+                pipe.set(seq_key, seq, ex=LAST_TTL * 2)
+                pipe.publish(f"stream:{symbol}", encode(frame))
+                pipe.execute()
+                return frame
+            except redis.WatchError:
+                continue
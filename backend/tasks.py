@@ -1,13 +1,73 @@
-import os, json, datetime
+import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 from backend.models.unified_sentiment import get_unified_sentiment
+from backend.models.market_data       import provider as market_provider
 from backend.cache import r
+from backend.singleflight import single_flight
+from backend.batch import normalize_symbols, analyze_many
+from backend import stream_codec
+from backend.timeseries import ts_store
+from backend.startup import warmup
+from backend.models.registry import registry
+from backend import scheduler
 
 broker = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 celery = Celery("tasks", broker=broker, backend=broker)
 
+@worker_init.connect
+def _preload(**_):
+    # prefork parent: load everything once, children share it copy-on-write
+    warmup()
+    registry.freeze()
+
+@worker_process_init.connect
+def _warmup(**_):
+    # no-op after _preload; covers pools that don't fork from a warm parent
+    warmup()
+
+# shares in-flight work with the API through the same Redis lease
+shared_unified_sentiment = single_flight("unified")(get_unified_sentiment)
+
 @celery.task
 def poll_symbol(symbol: str, window: int = 5, include_twitter: bool = True):
-    snap = get_unified_sentiment(symbol, window, include_twitter)
-    snap["ts"] = str(datetime.datetime.utcnow())
-    r.publish(f"stream:{symbol}", json.dumps(snap, default=str))
+    snap = shared_unified_sentiment(symbol, int(window), bool(include_twitter))
+    _publish(symbol, snap)
+
+@celery.task
+def poll_watchlist(symbols: list, window: int = 5, include_twitter: bool = False):
+    """One task for a whole watchlist: bulk OHLC, bounded per-symbol fan-out."""
+    done = {}
+    for sym, snap, err in analyze_many(normalize_symbols(symbols), shared_unified_sentiment,
+                                       int(window), bool(include_twitter)):
+        if err is None:
+            _publish(sym, snap)
+        done[sym] = err is None
+    return done
+
+def _publish(symbol: str, snap: dict):
+    # full frame first, then only the points that changed (backend/stream_codec.py)
+    stream_codec.publish(r, symbol, snap)
+    # daily per-source sentiment + OHLC for /history (backend/timeseries.py)
+    ts_store.record(symbol, snap)
+    # sentiment spread → poll frequency (backend/scheduler.py)
+    scheduler.observe(r, symbol, snap)
+
+
+@celery.task
+def schedule_tick():
+    """Beat entry: queue polls for every due streamed symbol (one loop, Redis-locked)."""
+    return scheduler.tick(r, lambda syms, window, twitter:
+                          poll_watchlist.delay(syms, window, twitter))
+
+celery.conf.beat_schedule = {
+    'schedule-streams': {'task': schedule_tick.name, 'schedule': scheduler.TICK,
+                         'options': {'expires': scheduler.TICK}},
+}
+
+
+@celery.task
+def refresh_market(symbols: list, days: int = 30):
+    """Warm quote + OHLC caches for many symbols with one bulk download."""
+    snaps = market_provider.snapshots(symbols, days)
+    return {sym: bool(s['info'].get('currentPrice')) for sym, s in snaps.items()}
@@ -0,0 +1,160 @@
+# backend/timeseries.py
+"""
+Daily time-series store written by the poller and read by /history.
+
+    ts:sent:<symbol>:<source>:<YYYY-MM>   hash date → [sentiment, count]   reddit / twitter / news
+    ts:ohlc:<symbol>:<YYYY-MM>            hash date → [open, high, low, close, volume]
+
+It lives in Redis because the API and the Celery worker run as separate
+services with separate disks; both already share REDIS_URL.  Fields are
+upserted: the latest poll wins for a day, and days that upstream no longer
+returns are kept.  Each month is its own hash and expires TS_RETENTION_DAYS
+after the month ends, so memory stays bounded.  A range read is one
+pipelined HGETALL per series and month in [start, end], then bucketed in
+Python.
+"""
+import os, json, datetime
+import redis
+import pandas as pd
+
+from backend.cache import r
+from backend.serialize import num
+
+SOURCES     = ('reddit', 'twitter', 'news')
+OHLC        = ('open', 'high', 'low', 'close', 'volume')
+RETENTION   = int(os.getenv("TS_RETENTION_DAYS", 730))
+
+
+def _week(d: str) -> str:
+    day = datetime.date.fromisoformat(d)
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()   # Monday of that week
+
+
+RESOLUTIONS = {
+    'day'  : lambda d: d,
+    'week' : _week,
+    'month': lambda d: d[:8] + '01',
+}
+
+
+def _day(ts) -> str:
+    return ts.strftime('%Y-%m-%d') if hasattr(ts, 'strftime') else str(ts)[:10]
+
+
+def _months(start: str, end: str) -> list:
+    """'YYYY-MM' of every month touching [start, end]."""
+    y, m   = int(start[:4]), int(start[5:7])
+    out    = []
+    while f"{y:04d}-{m:02d}" <= end[:7]:
+        out.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def _expires(month: str) -> int:
+    """Unix time RETENTION days after the end of `month`."""
+    y, m = int(month[:4]), int(month[5:7])
+    end  = datetime.datetime(y + m // 12, m % 12 + 1, 1, tzinfo=datetime.timezone.utc)
+    return int((end + datetime.timedelta(days=RETENTION)).timestamp())
+
+
+def _by_month(rows: dict) -> dict:
+    out = {}
+    for d, v in rows.items():
+        out.setdefault(d[:7], {})[d] = v
+    return out
+
+
+def _sentiment(rows: list) -> tuple:
+    """Count-weighted mean per bucket (plain mean where counts are missing), Σ count."""
+    counted = [(s, c) for s, c in rows if c is not None]
+    total   = sum(c for _, c in counted) if counted else None
+    if total:
+        return sum(s * c for s, c in counted) / total, total
+    return sum(s for s, _ in rows) / len(rows), total
+
+
+def _bar(rows: list) -> list:
+    """rows sorted by date → first open, max high, min low, last close, Σ volume."""
+    def agg(i, fn):
+        vals = [row[i] for row in rows if row[i] is not None]
+        return fn(vals) if vals else None
+    return [rows[0][0], agg(1, max), agg(2, min), rows[-1][3], agg(4, sum)]
+
+
+class TimeSeriesStore:
+    def __init__(self, client):
+        self.r = client
+
+    # ---------- write side (poller) ----------
+    def record(self, symbol: str, snap: dict) -> None:
+        """Upsert per-source daily sentiment/counts and OHLC from a unified snapshot."""
+        pipe = self.r.pipeline(transaction=False)
+        for source, df in (snap.get('source_daily') or {}).items():
+            rows = {_day(ts): json.dumps([float(sent), None if cnt is None or cnt != cnt else int(cnt)])
+                    for ts, sent, cnt in zip(df.index, df['sentiment'], df['count'])
+                    if sent is not None and sent == sent}
+            for month, part in _by_month(rows).items():
+                pipe.hset(f"ts:sent:{symbol}:{source}:{month}", mapping=part)
+                pipe.expireat(f"ts:sent:{symbol}:{source}:{month}", _expires(month))
+
+        hist = snap.get('stock_history')
+        if hist is not None and not hist.empty and 'Close' in hist:
+            cols = [hist[c] if c in hist else pd.Series(None, index=hist.index, dtype=float)
+                    for c in ('Open', 'High', 'Low', 'Close', 'Volume')]
+            bars = {_day(ts): json.dumps(list(map(num, vals)))
+                    for ts, *vals in zip(hist.index, *cols) if vals[3] == vals[3]}
+            for month, part in _by_month(bars).items():
+                pipe.hset(f"ts:ohlc:{symbol}:{month}", mapping=part)
+                pipe.expireat(f"ts:ohlc:{symbol}:{month}", _expires(month))
+        try:
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+    # ---------- read side ----------
+    def range(self, symbol: str, start: str, end: str, resolution: str = 'day') -> dict:
+        """Columnar {index, <source>, <source>_count, open, high, low, close, volume}."""
+        bucket = RESOLUTIONS[resolution]
+        months = _months(start, end)
+        keys   = [*(f"ts:sent:{symbol}:{s}" for s in SOURCES), f"ts:ohlc:{symbol}"]
+        pipe   = self.r.pipeline(transaction=False)
+        for key in keys:
+            for month in months:
+                pipe.hgetall(f"{key}:{month}")
+        parts = iter(pipe.execute())
+        *sent, bars = [{k.decode(): json.loads(v) for _ in months for k, v in next(parts).items()}
+                       for _ in keys]
+
+        def grouped(rows: dict) -> dict:
+            out = {}
+            for d in sorted(rows):
+                if start <= d <= end:
+                    out.setdefault(bucket(d), []).append(rows[d])
+            return out
+
+        sent = {s: {b: _sentiment(rows) for b, rows in grouped(h).items()}
+                for s, h in zip(SOURCES, sent)}
+        bars = {b: _bar(rows) for b, rows in grouped(bars).items()}
+
+        index = sorted(set(bars).union(*sent.values()))
+        cols  = {}
+        for s in SOURCES:
+            cols[s]            = [sent[s].get(b, (None, None))[0] for b in index]
+            cols[f"{s}_count"] = [sent[s].get(b, (None, None))[1] for b in index]
+        for i, c in enumerate(OHLC):
+            cols[c] = [bars[b][i] if b in bars else None for b in index]
+        return {'symbol': symbol, 'resolution': resolution, 'start': start, 'end': end,
+                'index': index, **cols}
+
+
+def parse_range(start: str | None, end: str | None, default_days: int = 365) -> tuple[str, str]:
+    """ISO dates (inclusive); raises ValueError on bad input."""
+    end_d   = datetime.date.fromisoformat(end) if end else datetime.date.today()
+    start_d = datetime.date.fromisoformat(start) if start else end_d - datetime.timedelta(days=default_days)
+    if start_d > end_d:
+        raise ValueError("start is after end")
+    return start_d.isoformat(), end_d.isoformat()
+
+
+ts_store = TimeSeriesStore(r)
@@ -0,0 +1,119 @@
+# bench/fixtures.py
+"""
+Deterministic upstream fixtures, shaped like the real responses:
+PRAW submissions, tweepy tweets, NewsAPI JSON and yfinance info/OHLC.
+
+Everything is derived from (symbol, seed), so two runs and two machines
+see identical inputs and baselines stay comparable.
+"""
+import time, random, hashlib, datetime
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+_OPENERS = ["Thoughts on", "Why I'm buying", "Just sold", "DD:", "Is it time to dump",
+            "Earnings preview for", "Long term hold:", "Massive short squeeze on",
+            "Bearish on", "Anyone else worried about"]
+_BODIES  = ["Revenue beat expectations and guidance looks great.",
+            "Margins are terrible and management keeps disappointing.",
+            "Honestly not sure, the chart looks flat.",
+            "Insane growth, this could be a huge winner!",
+            "Lawsuit risk is real, I'm scared of another crash?",
+            "Solid fundamentals, good dividend, boring but safe.",
+            "The CEO is a fraud and the numbers are a disaster.",
+            "Buying more on every dip, love this company.",
+            "Valuation is stupid, bubble territory.",
+            "Nothing new, holding my position."]
+
+
+def _rng(symbol: str, seed: int, kind: str) -> random.Random:
+    h = hashlib.sha1(f"{symbol}:{seed}:{kind}".encode()).hexdigest()
+    return random.Random(int(h[:12], 16))
+
+
+def _text(rng: random.Random, symbol: str, n: int = 3) -> tuple[str, str]:
+    title = f"{rng.choice(_OPENERS)} ${symbol}"
+    body  = " ".join(rng.choice(_BODIES) for _ in range(rng.randint(1, n)))
+    return title, body
+
+
+# ---------- Reddit (praw.models.Submission attributes the analyzer reads) ----------
+def reddit_submissions(symbol: str, n: int = 120, days: int = 30, seed: int = 0,
+                       now: float | None = None) -> list:
+    rng  = _rng(symbol, seed, "reddit")
+    now  = now or time.time()
+    subs = []
+    for i in range(n):
+        title, body = _text(rng, symbol, 4)
+        subs.append(SimpleNamespace(
+            id          = f"{symbol.lower()}{seed}x{i:05d}",
+            title       = title,
+            selftext    = body * rng.randint(1, 3),
+            score       = rng.randint(0, 400),
+            created_utc = now - (i + 1) * days * 86400 / (n + 1),       # newest first
+            permalink   = f"/r/stocks/comments/{symbol.lower()}{i}/",
+            subreddit   = SimpleNamespace(display_name=rng.choice(
+                              ["stocks", "investing", "wallstreetbets"])),
+        ))
+    return subs
+
+
+def reddit_votes(ids: list, seed: int = 0) -> list:
+    """Later upvote counts for already-seen posts (reddit.info results)."""
+    return [SimpleNamespace(id=i, score=_rng(i, seed, "votes").randint(0, 2000)) for i in ids]
+
+
+# ---------- Twitter (tweepy.Response.data items) ----------
+def tweets(symbol: str, n: int = 20, seed: int = 0) -> list:
+    rng = _rng(symbol, seed, "twitter")
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [SimpleNamespace(created_at=now - datetime.timedelta(minutes=37 * i),
+                            text=" ".join(_text(rng, symbol, 1)))
+            for i in range(n)]
+
+
+# ---------- NewsAPI /v2/everything JSON ----------
+def news_json(symbol: str, n: int = 20, seed: int = 0) -> dict:
+    rng = _rng(symbol, seed, "news")
+    now = datetime.datetime.now(datetime.timezone.utc)
+    articles = []
+    for i in range(n):
+        title, body = _text(rng, symbol, 2)
+        articles.append({
+            "title"      : title,
+            "description": body,
+            "publishedAt": (now - datetime.timedelta(hours=5 * i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "url"        : f"https://news.example/{symbol.lower()}/{i}",
+        })
+    return {"status": "ok", "totalResults": n, "articles": articles}
+
+
+# ---------- yfinance ----------
+def ticker_info(symbol: str, seed: int = 0) -> dict:
+    rng = _rng(symbol, seed, "info")
+    px  = round(rng.uniform(20, 500), 2)
+    return {"currentPrice": px, "currency": "USD",
+            "trailingPE": round(rng.uniform(8, 60), 2), "forwardPE": round(rng.uniform(8, 50), 2),
+            "trailingEps": round(px / 25, 2), "forwardEps": round(px / 22, 2),
+            "earningsDate": [int(time.time()) + 30 * 86400]}
+
+
+def ohlc(symbol: str, days: int = 30, seed: int = 0) -> pd.DataFrame:
+    rng   = np.random.default_rng(int(hashlib.sha1(f"{symbol}:{seed}".encode()).hexdigest()[:8], 16))
+    idx   = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=max(1, days * 5 // 7))
+    close = ticker_info(symbol, seed)["currentPrice"] * np.exp(np.cumsum(rng.normal(0, 0.015, len(idx))))
+    open_ = close * (1 + rng.normal(0, 0.005, len(idx)))
+    return pd.DataFrame({
+        "Open"  : open_,
+        "High"  : np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.004, len(idx)))),
+        "Low"   : np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.004, len(idx)))),
+        "Close" : close,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(idx)).astype(float),
+    }, index=idx)
+
+
+def corpus(n: int, seed: int = 0) -> list:
+    """n distinct post-sized texts for raw scoring throughput."""
+    rng = _rng("CORPUS", seed, "texts")
+    return [f"{' '.join(_text(rng, 'XYZ', 4))} #{i}" for i in range(n)]
+
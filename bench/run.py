@@ -0,0 +1,258 @@
+# bench/run.py
+"""
+Offline benchmarks for the analysis pipeline.
+
+    python -m bench.run                                   # everything, fakeredis
+    python -m bench.run --only scoring,unified -n 50 --latency-ms 40
+    python -m bench.run --save-baseline bench/baseline.json
+    python -m bench.run --baseline bench/baseline.json    # exit 1 on regression
+
+Upstreams are bench/standins.py serving bench/fixtures.py.  Redis is
+fakeredis unless --redis-url is given (keys are namespaced by fresh
+symbols, nothing is flushed).  Every benchmark uses fresh symbols per
+iteration, so it measures the cold path, not cache hits.  Latencies are
+wall time per call; peak memory is the tracemalloc peak over a few
+extra calls run after the timed ones.
+"""
+import os, sys, json, time, asyncio, argparse, platform, tracemalloc
+import numpy as np
+
+BENCHES = ('scoring', 'reddit', 'unified', 'analyze', 'ws_fanout')
+
+
+# ---------- environment (must run before backend is imported) ----------
+def _prepare(args) -> None:
+    for provider in ('REDDIT', 'TWITTER', 'NEWSAPI', 'YAHOO'):
+        os.environ.setdefault(f"QUOTA_{provider}", "1000000,1000000")
+    os.environ.setdefault("WARMUP", "off")
+    os.environ.setdefault("NLTK_DOWNLOAD", "0")
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+        return
+    try:
+        import fakeredis
+    except ImportError:
+        sys.exit("bench: pip install fakeredis, or pass --redis-url")
+    import redis, redis.asyncio
+    server = fakeredis.FakeServer()
+    redis.Redis.from_url  = classmethod(lambda cls, *a, **k: fakeredis.FakeRedis(server=server))
+    redis.asyncio.from_url = lambda *a, **k: fakeredis.FakeAsyncRedis(server=server)
+
+
+# ---------- measurement ----------
+def _summary(name: str, lat: list, ops: int, elapsed: float, peak: int, unit: str) -> dict:
+    lat = np.asarray(lat) * 1000
+    return {
+        'name'      : name,
+        'n'         : len(lat),
+        'p50_ms'    : round(float(np.percentile(lat, 50)), 3),
+        'p99_ms'    : round(float(np.percentile(lat, 99)), 3),
+        'throughput': round(ops / elapsed, 2) if elapsed else 0.0,
+        'unit'      : unit,
+        'peak_mb'   : round(peak / 2**20, 2),
+    }
+
+
+MEMORY_CALLS = 3          # extra calls traced by tracemalloc (it slows everything down)
+
+
+def measure(name: str, fn, n: int, ops_per_call: int = 1, unit: str = 'calls/s') -> dict:
+    fn(-1)                                        # warm imports / lazy objects
+    lat = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        fn(i)
+        lat.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    for i in range(n, n + MEMORY_CALLS):
+        fn(i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _summary(name, lat, n * ops_per_call, elapsed, peak, unit)
+
+
+async def measure_async(name: str, fn, n: int, ops_per_call: int = 1,
+                        unit: str = 'calls/s') -> dict:
+    await fn(-1)
+    lat = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        await fn(i)
+        lat.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    for i in range(n, n + MEMORY_CALLS):
+        await fn(i)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return _summary(name, lat, n * ops_per_call, elapsed, peak, unit)
+
+
+def _sym(prefix: str, i: int) -> str:
+    return f"{prefix}{i + 1:04d}" if i >= 0 else f"{prefix}WARM"
+
+
+# ---------- benchmarks ----------
+def bench_scoring(args) -> dict:
+    from bench import fixtures
+    from backend.models.enhanced_sentiment import EnhancedSentimentAnalyzer
+    enh   = EnhancedSentimentAnalyzer()
+    size  = args.batch
+    texts = fixtures.corpus(size * (args.n + MEMORY_CALLS + 1))
+    return measure('scoring', lambda i: enh.score_batch(texts[(i + 1) * size:(i + 2) * size]),
+                   args.n, ops_per_call=size, unit='texts/s')
+
+
+def bench_reddit(args) -> dict:
+    from backend.models.unified_sentiment import analyzers
+    reddit = analyzers()['reddit']
+    return measure('reddit', lambda i: reddit.analyze_sentiment(_sym('RD', i)), args.n)
+
+
+def bench_unified(args) -> dict:
+    from backend.models.unified_sentiment import get_unified_sentiment
+    return measure('unified', lambda i: get_unified_sentiment(_sym('UN', i), 5, True), args.n)
+
+
+def bench_analyze(args) -> dict:
+    import httpx
+    from backend.main import app
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def call(i):
+                resp = await client.post("/analyze", json={"stock_symbol": _sym('AN', i),
+                                                           "window": 5, "twitter": True})
+                resp.raise_for_status()
+            return await measure_async('analyze', call, args.n)
+    return asyncio.run(run())
+
+
+def bench_ws_fanout(args) -> dict:
+    """Hub broadcast of one delta frame to N subscribed sockets until all have it."""
+    from collections import defaultdict
+    import redis.asyncio as aioredis
+    from backend.hub import StreamHub, RESYNC
+    from backend import stream_codec
+
+    subs  = args.subscribers
+    frame = stream_codec.encode({'type': 'delta', 'seq': 2, 'base': 1, 'symbol': 'WS',
+                                 'data': {'set': {'average_sentiment': 0.12},
+                                          'points': {'daily_sentiment': {'2024-01-02': 0.3}}}})
+
+    async def run():
+        r   = aioredis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        hub = StreamHub(r, defaultdict(set), queue_size=64)
+        socks, got, done = [object() for _ in range(subs)], [0], asyncio.Event()
+
+        async def consume(q):
+            while True:
+                item = await q.get()
+                if item is RESYNC:
+                    continue
+                got[0] += 1
+                if got[0] == subs:
+                    done.set()
+
+        tasks = [asyncio.create_task(consume(await hub.join('WS', ws))) for ws in socks]
+
+        async def one(_):
+            got[0] = 0
+            done.clear()
+            hub.broadcast('WS', frame)
+            await done.wait()
+
+        try:
+            return await measure_async('ws_fanout', one, args.n * 10, ops_per_call=subs,
+                                       unit='deliveries/s')
+        finally:
+            for t in tasks:
+                t.cancel()
+            for ws in socks:
+                await hub.leave('WS', ws)
+            await hub.close()
+            await r.aclose()
+    return asyncio.run(run())
+
+
+# ---------- reporting / baseline ----------
+def report(results: list) -> str:
+    head = f"{'bench':<11}{'n':>6}{'p50 ms':>11}{'p99 ms':>11}{'throughput':>14}  {'unit':<14}{'peak MB':>9}"
+    rows = [f"{r['name']:<11}{r['n']:>6}{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}"
+            f"{r['throughput']:>14.1f}  {r['unit']:<14}{r['peak_mb']:>9.2f}" for r in results]
+    return "\n".join([head, "-" * len(head), *rows])
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> tuple[str, bool]:
+    """Relative change per metric; a regression is >tolerance in the bad direction."""
+    base  = {r['name']: r for r in baseline.get('results', [])}
+    lines, regressed = [], False
+    for r in results:
+        b = base.get(r['name'])
+        if b is None:
+            lines.append(f"{r['name']:<11} (no baseline)")
+            continue
+        parts = []
+        for key, worse_if_up in (('p50_ms', True), ('p99_ms', True),
+                                 ('throughput', False), ('peak_mb', True)):
+            old, new = b[key], r[key]
+            change   = (new - old) / old if old else 0.0
+            bad      = change > tolerance if worse_if_up else change < -tolerance
+            regressed |= bad
+            parts.append(f"{key} {change:+.1%}{' !' if bad else ''}")
+        lines.append(f"{r['name']:<11} " + "  ".join(parts))
+    return "\n".join(lines), regressed
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--only', default=','.join(BENCHES), help=f"comma list of {', '.join(BENCHES)}")
+    ap.add_argument('-n', type=int, default=30, help="iterations per benchmark")
+    ap.add_argument('--batch', type=int, default=500, help="texts per scoring call")
+    ap.add_argument('--subscribers', type=int, default=200, help="sockets for ws_fanout")
+    ap.add_argument('--latency-ms', type=float, default=0.0, help="simulated upstream latency")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--redis-url', default=None, help="real Redis instead of fakeredis")
+    ap.add_argument('--json', default=None, help="write results here")
+    ap.add_argument('--baseline', default=None, help="compare against this results file")
+    ap.add_argument('--save-baseline', default=None, help="write results as the new baseline")
+    ap.add_argument('--tolerance', type=float, default=0.15)
+    args = ap.parse_args(argv)
+
+    _prepare(args)
+    from bench import standins
+    standins.install(args.latency_ms, args.seed)
+
+    results = []
+    for name in [b.strip() for b in args.only.split(',') if b.strip()]:
+        if name not in BENCHES:
+            sys.exit(f"bench: unknown benchmark {name!r}")
+        results.append(globals()[f"bench_{name}"](args))
+        print(f"  {name}: done", file=sys.stderr)
+
+    doc = {
+        'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                 'machine': platform.machine(), 'latency_ms': args.latency_ms, 'n': args.n},
+        'results': results,
+    }
+    print(report(results))
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, 'w') as fh:
+            json.dump(doc, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            text, regressed = compare(results, json.load(fh), args.tolerance)
+        print(f"\nvs {args.baseline} (tolerance {args.tolerance:.0%})\n{text}")
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
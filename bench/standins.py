@@ -0,0 +1,117 @@
+# bench/standins.py
+"""
+Local stand-ins for PRAW, tweepy, NewsAPI (requests) and yfinance that
+serve bench/fixtures.py with a configurable per-call latency, so the
+real analyzers run their full code paths without touching the network.
+"""
+import sys, time, types
+import pandas as pd
+
+from bench import fixtures
+
+
+class Latency:
+    """Simulated upstream round-trip in seconds (per call, not per item)."""
+
+    def __init__(self, ms: float = 0.0):
+        self.s = ms / 1000
+
+    def __call__(self):
+        if self.s:
+            time.sleep(self.s)
+
+
+# ---------- PRAW ----------
+class FakeReddit:
+    def __init__(self, latency: Latency, seed: int = 0):
+        self.latency, self.seed = latency, seed
+
+    def subreddit(self, name: str) -> 'FakeReddit':
+        return self
+
+    def search(self, query: str, sort: str = 'new', limit: int = 100, **_):
+        self.latency()
+        symbol = query.split()[0]
+        return iter(fixtures.reddit_submissions(symbol, n=limit, seed=self.seed))
+
+    def info(self, fullnames: list):
+        self.latency()
+        return iter(fixtures.reddit_votes([f.removeprefix('t3_') for f in fullnames], self.seed))
+
+
+# ---------- tweepy ----------
+class FakeTweepyClient:
+    def __init__(self, latency: Latency, seed: int = 0):
+        self.latency, self.seed = latency, seed
+
+    def search_recent_tweets(self, query: str, max_results: int = 10, **_):
+        self.latency()
+        return types.SimpleNamespace(data=fixtures.tweets(query.split()[0], n=max_results,
+                                                          seed=self.seed))
+
+
+# ---------- NewsAPI over requests.Session ----------
+class _Response:
+    status_code = 200
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    def json(self) -> dict:
+        return self._data
+
+
+class FakeNewsSession:
+    def __init__(self, latency: Latency, seed: int = 0):
+        self.latency, self.seed = latency, seed
+
+    def get(self, url: str, params: dict = None, **_):
+        self.latency()
+        symbol = params["q"].split()[0]
+        return _Response(fixtures.news_json(symbol, n=params.get("pageSize", 20), seed=self.seed))
+
+
+# ---------- yfinance (installed as sys.modules['yfinance']) ----------
+def fake_yfinance(latency: Latency, seed: int = 0) -> types.ModuleType:
+    yf = types.ModuleType("yfinance")
+
+    class Ticker:
+        def __init__(self, symbol: str):
+            self.symbol = symbol
+            self._info  = None
+
+        @property
+        def info(self) -> dict:
+            # memoised per instance, like yfinance's Ticker._quote._info
+            if self._info is None:
+                latency()
+                self._info = fixtures.ticker_info(self.symbol, seed)
+            return self._info
+
+        def history(self, period: str = "30d", **_) -> pd.DataFrame:
+            latency()
+            return fixtures.ohlc(self.symbol, int(period.rstrip("d")), seed)
+
+    def download(symbols, period: str = "30d", group_by: str = "ticker", **_) -> pd.DataFrame:
+        latency()
+        days   = int(period.rstrip("d"))
+        frames = {s: fixtures.ohlc(s, days, seed) for s in symbols}
+        return pd.concat(frames, axis=1)
+
+    yf.Ticker, yf.download = Ticker, download
+    return yf
+
+
+def install(latency_ms: float = 0.0, seed: int = 0) -> None:
+    """Point every upstream the backend uses at the stand-ins."""
+    latency = Latency(latency_ms)
+    sys.modules["yfinance"] = fake_yfinance(latency, seed)
+
+    from backend.models.unified_sentiment import analyzers
+    for name, analyzer in analyzers().items():
+        if name == 'reddit':
+            analyzer.reddit = FakeReddit(latency, seed)           # shadows the cached_property
+        elif name == 'twitter':
+            analyzer.client = FakeTweepyClient(latency, seed)
+        elif name == 'news':
+            analyzer.session = FakeNewsSession(latency, seed)
@@ -1,5 +1,27 @@
 // frontend/src/hooks.ts
 import { useEffect, useRef, useState } from "react";
+const SERIES = ["daily_sentiment", "rolling_mean", "ci_lower", "ci_upper", "close"];
+// apply a delta frame's data to the last full state (backend/stream_codec.py)
+function applyDelta(state, delta) {
+    const next = { ...state, ...(delta.set || {}) };
+    for (const [k, pts] of Object.entries(delta.points || {}))
+        next[k] = { ...(next[k] || {}), ...pts };
+    for (const [k, dates] of Object.entries(delta.drop || {})) {
+        const s = { ...(next[k] || {}) };
+        dates.forEach(d => delete s[d]);
+        next[k] = s;
+    }
+    return next;
+}
+// stream state → the snapshot shape the components read
+function toSnap(state) {
+    const snap = { ...state };
+    for (const k of SERIES)
+        snap[k] = Object.fromEntries(Object.entries(state[k] || {}).sort());
+    snap.stock_history = Object.fromEntries(Object.entries(snap.close).map(([d, v]) => [d, { Close: v }]));
+    delete snap.close;
+    return snap;
+}
 export function useSentimentStream(symbol) {
     const [snap, setSnap] = useState(null);
     const wsRef = useRef(null);
@@ -21,7 +43,28 @@ export function useSentimentStream(symbol) {
         console.log("Connecting to WS:", url);
         const ws = new WebSocket(url);
         ws.onopen = () => console.log("WS open");
-        ws.onmessage = (e) => setSnap(JSON.parse(e.data));
+        // full frames replace the state; a delta applies only on top of the
+        // seq it was built from, anything else asks for a fresh full frame
+        let state = null, seq = null, resyncing = false;
+        ws.onmessage = (e) => {
+            const frame = JSON.parse(e.data);
+            if (frame.type === "full") {
+                state = frame.data;
+                resyncing = false;
+            }
+            else if (frame.type === "delta" && state && frame.base === seq) {
+                state = applyDelta(state, frame.data);
+            }
+            else {
+                if (!resyncing && ws.readyState === WebSocket.OPEN) {
+                    resyncing = true;
+                    ws.send("resync");
+                }
+                return;
+            }
+            seq = frame.seq;
+            setSnap(toSnap(state));
+        };
         ws.onerror = (err) => console.error("WS error", err);
         ws.onclose = () => console.log("WS closed");
         wsRef.current = ws;
@@ -0,0 +1,114 @@
+# tests/test_rolling_stats.py
+"""
+RollingAggregator against the pandas path it replaced (volume-weighted
+rolling mean/std, CI and Series.corr with next-day returns), through
+appends, revised tail days and a moved first day.
+"""
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.models.rolling_stats import RollingAggregator, Welford, CoMoments
+
+TOL = 1e-9
+
+
+def reference(daily_sent: pd.Series, daily_counts: pd.Series, close: pd.Series, window: int) -> dict:
+    """The pre-incremental pandas computation, verbatim."""
+    if not daily_counts.empty and daily_counts.max() > 0:
+        weighted = daily_sent * (daily_counts / daily_counts.max())
+    else:
+        weighted = daily_sent.copy()
+    rm = weighted.rolling(window, min_periods=3).mean()
+    rs = weighted.rolling(window, min_periods=3).std().fillna(0)
+
+    valid    = daily_counts.reindex(rm.index, fill_value=0) >= 5
+    ci_lower = pd.Series(np.nan, index=rm.index)
+    ci_upper = ci_lower.copy()
+    ci_lower.loc[valid] = rm[valid] - rs[valid]
+    ci_upper.loc[valid] = rm[valid] + rs[valid]
+
+    trend = 'Neutral'
+    m = rm.dropna()
+    if not m.empty:
+        if   m.iloc[-1] > 0.20: trend = 'Bullish'
+        elif m.iloc[-1] < -0.20: trend = 'Bearish'
+
+    corr = float(weighted.corr(close.pct_change().shift(-1)))
+    return {'daily_sentiment': weighted, 'rolling_mean': rm, 'ci_lower': ci_lower,
+            'ci_upper': ci_upper, 'trend': trend, 'corr': 0.0 if corr != corr else corr}
+
+
+def series(start: str, days: int, seed: int) -> tuple[pd.Series, pd.Series, pd.Series]:
+    rng   = np.random.default_rng(seed)
+    idx   = pd.date_range(start, periods=days, freq='D', name='date')
+    sent  = pd.Series(rng.normal(0, 0.4, days), index=idx)
+    cnt   = pd.Series(rng.integers(0, 12, days), index=idx)
+    sent[cnt == 0] = np.nan                                   # gap days
+    bdays = pd.bdate_range(start, periods=days)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(bdays)))), index=bdays)
+    return sent, cnt, close
+
+
+def assert_matches(agg: RollingAggregator, sent, cnt, close, window: int) -> None:
+    agg.update(sent, cnt)
+    agg.update_returns(close)
+    got, want = agg.result(), reference(sent, cnt, close, window)
+    for k in ('daily_sentiment', 'rolling_mean', 'ci_lower', 'ci_upper'):
+        np.testing.assert_allclose(got[k].to_numpy(), want[k].to_numpy(), rtol=0, atol=TOL,
+                                   equal_nan=True, err_msg=k)
+        assert list(got[k].index) == list(want[k].index)
+    assert got['trend'] == want['trend']
+    assert got['corr'] == pytest.approx(want['corr'], abs=TOL)
+
+
+@pytest.mark.parametrize('window', [3, 5, 7])
+def test_fresh_build_matches_pandas(window):
+    sent, cnt, close = series('2024-01-01', 40, seed=window)
+    assert_matches(RollingAggregator(window), sent, cnt, close, window)
+
+
+@pytest.mark.parametrize('window', [3, 5])
+def test_incremental_updates_match_pandas(window):
+    sent, cnt, close = series('2024-01-01', 60, seed=10 + window)
+    agg = RollingAggregator(window)
+
+    for end in range(5, 45, 3):                               # new days appended
+        assert_matches(agg, sent.iloc[:end], cnt.iloc[:end], close, window)
+
+    revised = sent.iloc[:45].copy()                           # tail days revised
+    revised.iloc[-4:] += 0.3
+    revised_cnt = cnt.iloc[:45].copy()
+    revised_cnt.iloc[-2] += 7
+    assert_matches(agg, revised, revised_cnt, close, window)
+
+    assert_matches(agg, sent.iloc[4:50], cnt.iloc[4:50], close, window)   # first day moved
+
+
+def test_state_round_trip_keeps_updating():
+    sent, cnt, close = series('2024-03-01', 30, seed=3)
+    agg = RollingAggregator(5)
+    agg.update(sent.iloc[:20], cnt.iloc[:20])
+    agg.update_returns(close)
+
+    copy = RollingAggregator.from_state(agg.to_state())
+    assert_matches(copy, sent, cnt, close, 5)
+
+
+def test_welford_and_comoments_remove():
+    rng = np.random.default_rng(0)
+    xs, ys = rng.normal(size=200), rng.normal(size=200)
+    w, co = Welford(), CoMoments()
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        w.add(x)
+        co.add(x, y)
+        if i >= 20:                                           # keep the last 20
+            w.remove(xs[i - 20])
+            co.remove(xs[i - 20], ys[i - 20])
+    tail_x, tail_y = xs[-20:], ys[-20:]
+    assert w.n == 20
+    assert w.mean  == pytest.approx(tail_x.mean(), abs=TOL)
+    assert w.std() == pytest.approx(tail_x.std(ddof=1), abs=TOL)
+    assert co.corr() == pytest.approx(np.corrcoef(tail_x, tail_y)[0, 1], abs=TOL)
+    assert math.isnan(Welford().std())